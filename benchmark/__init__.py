@@ -0,0 +1,5 @@
+"""benchmark suite of simpleparser.
+
+Run ``python -m benchmark --save`` once to record a baseline, then
+``python -m benchmark`` to compare against it.
+"""
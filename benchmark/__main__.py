@@ -0,0 +1,8 @@
+"""run the benchmark suite."""
+
+import sys
+from benchmark.suite import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""deterministic synthetic corpora for the benchmarks."""
+
+import random
+from typing import Callable, Dict, List
+
+
+def csv_corpus(size: int, seed: int = 0) -> str:
+    r"""Return about size characters of CSV for demo_csv_parser.CsvParser.
+
+    Rows mix quoted cells with escaped quotes and commas, and plain cells.
+
+    Example
+    -------
+    >>> text = csv_corpus(60)
+    >>> len(text), text.count("\n")
+    (75, 3)
+    >>> csv_corpus(1000) == csv_corpus(1000)
+    True
+    """
+    rnd = random.Random(seed)
+    rows: List[str] = []
+    length = 0
+    while length < size:
+        cells = []
+        for _ in range(rnd.randint(2, 4)):
+            kind = rnd.random()
+            if kind < 0.3:
+                cells.append(str(rnd.randint(0, 99999)))
+            elif kind < 0.6:
+                cells.append(f'"{_word(rnd)} ""{_word(rnd)}"" {_word(rnd)}"')
+            else:
+                cells.append(f'"{_word(rnd)}, {_word(rnd)}"')
+        row = ",".join(cells) + "\n"
+        rows.append(row)
+        length += len(row)
+    return "".join(rows)
+
+
+def record_corpus(size: int, seed: int = 0, record_size: int = 50) -> str:
+    r"""Return about size characters of CSV records of record_size characters.
+
+    Example
+    -------
+    >>> [len(line) for line in record_corpus(200).splitlines(True)]
+    [50, 50, 50, 50]
+    """
+    rnd = random.Random(seed)
+    rows: List[str] = []
+    for _ in range(max(size // record_size, 1)):
+        row = f'"{_word(rnd)} ""{_word(rnd)}""",{rnd.randint(0, 99999)},'
+        rows.append(row + "x" * (record_size - len(row) - 1) + "\n")
+    return "".join(rows)
+
+
+def numeric_corpus(size: int, seed: int = 0) -> str:
+    r"""Return about size characters of CSV rows of an int, a float and an int.
+
+    Example
+    -------
+    >>> numeric_corpus(40)
+    '50494,7947.72,6890\n5306,2714.93,8376\n63691,4246.04,4969\n'
+    """
+    rnd = random.Random(seed)
+    rows: List[str] = []
+    length = 0
+    while length < size:
+        row = f"{rnd.randint(0, 99999)},{rnd.randint(0, 999999) / 100},{rnd.randint(0, 9999)}\n"  # noqa: E501
+        rows.append(row)
+        length += len(row)
+    return "".join(rows)
+
+
+def ambiguous_corpus(size: int, seed: int = 0) -> str:
+    r"""Return about size characters of lines of a's followed by fewer b's.
+
+    Every line is a sentence of the ambiguous grammar
+    S -> a S b | a S | a, which backtracking parses in exponential time.
+
+    Example
+    -------
+    >>> ambiguous_corpus(20)
+    'aaaaaaaaab\naaaaaaaaab\n'
+    """
+    rnd = random.Random(seed)
+    rows: List[str] = []
+    length = 0
+    while length < size:
+        a = rnd.randint(3, 9)
+        row = "a" * a + "b" * rnd.randint(0, min(a - 1, 2)) + "\n"
+        rows.append(row)
+        length += len(row)
+    return "".join(rows)
+
+
+def json_corpus(size: int, seed: int = 0) -> str:
+    """Return about size characters of nested JSON for demo_json_parser.JsonParser.
+
+    Example
+    -------
+    >>> json_corpus(40)
+    "{p0:{p0:988,p1:'Yt',p2:{p0:'G',p1:143,p2:[545,829]},p3:[747]}}"
+    """
+    rnd = random.Random(seed)
+    members: List[str] = []
+    length = 0
+    while length < size:
+        member = f"p{len(members)}:{_json_value(rnd, 3)}"
+        members.append(member)
+        length += len(member) + 1
+    return "{" + ",".join(members) + "}"
+
+
+def scheme_corpus(size: int, seed: int = 0) -> str:
+    """Return about size characters of deep s-expressions for schemeparser.
+
+    Example
+    -------
+    >>> scheme_corpus(30)
+    '(- (- (+ 1 2) (- 3 4)) (* (- 5 6) (- 7 8)))'
+    """
+    rnd = random.Random(seed)
+    depth = 1
+    while len(_sexp(random.Random(seed), depth, [0])) < size:
+        depth += 1
+    return _sexp(rnd, depth, [0])
+
+
+def _word(rnd: random.Random) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "".join(rnd.choice(letters) for _ in range(rnd.randint(1, 3)))
+
+
+def _json_value(rnd: random.Random, depth: int) -> str:
+    kind = rnd.random()
+    if depth == 0 or kind < 0.4:
+        return str(rnd.randint(0, 999))
+    if kind < 0.6:
+        return f"'{_word(rnd)}'"
+    if kind < 0.8:
+        items = [_json_value(rnd, depth - 1) for _ in range(rnd.randint(0, 3))]
+        return "[" + ",".join(items) + "]"
+    members = [f"p{i}:{_json_value(rnd, depth - 1)}"
+               for i in range(rnd.randint(1, 4))]
+    return "{" + ",".join(members) + "}"
+
+
+def _sexp(rnd: random.Random, depth: int, counter: List[int]) -> str:
+    if depth == 0:
+        counter[0] += 1
+        return str(counter[0])
+    op = rnd.choice("+-*")
+    left = _sexp(rnd, depth - 1, counter)
+    right = _sexp(rnd, depth - 1, counter)
+    return f"({op} {left} {right})"
+
+
+CORPORA: Dict[str, Callable[[int], str]] = {
+    "csv": csv_corpus,
+    "records": record_corpus,
+    "numeric": numeric_corpus,
+    "ambiguous": ambiguous_corpus,
+    "json": json_corpus,
+    "scheme": scheme_corpus,
+}
@@ -0,0 +1,314 @@
+"""throughput and memory benchmarks with regression thresholds."""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmark.corpora import (ambiguous_corpus, csv_corpus, json_corpus, numeric_corpus,
+                               record_corpus, scheme_corpus)
+
+
+Result = Dict[str, Any]
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _csv_parse() -> Callable[[str], Any]:
+    from demo.demo_csv_parser import CsvParser
+    return CsvParser().parse
+
+
+def _records_exec() -> Callable[[str], Any]:
+    from demo.demo_csv_parser import CsvParser
+    line = CsvParser().line
+    return lambda text: [line.exec(record) for record in text.splitlines()]
+
+
+def _records_batch() -> Callable[[str], Any]:
+    from demo.demo_csv_parser import CsvParser
+    line = CsvParser().line
+    return lambda text: line.exec_batch(text.splitlines())
+
+
+def _json_parse() -> Callable[[str], Any]:
+    from demo.demo_json_parser import JsonParser
+    return JsonParser().parse
+
+
+def tokens_to_value(tokens: List[str]) -> Any:
+    """Build Python values from the flat tokens of JsonParser (second pass).
+
+    Example
+    -------
+    >>> tokens_to_value(['{', 'p1', ':', '1', 'p2', ':', '[', "'a'", ']', '}'])
+    {'p1': 1, 'p2': ['a']}
+    """
+    position = 0
+
+    def value() -> Any:
+        nonlocal position
+        token = tokens[position]
+        position += 1
+        if token == "{":
+            members = {}
+            while tokens[position] != "}":
+                key = tokens[position]
+                position += 2
+                members[key] = value()
+            position += 1
+            return members
+        if token == "[":
+            items = []
+            while tokens[position] != "]":
+                items.append(value())
+            position += 1
+            return items
+        if token[:1] in "'\"":
+            return token[1:-1]
+        return int(token)
+
+    return value()
+
+
+def _json_two_pass() -> Callable[[str], Any]:
+    from demo.demo_json_parser import JsonParser
+    parser = JsonParser()
+    return lambda text: tokens_to_value(parser.parse(text).tokens)
+
+
+def _json_values() -> Callable[[str], Any]:
+    from demo.demo_json_parser import JsonValueParser
+    parser = JsonValueParser()
+    return lambda text: parser.parse(text).tokens[0]
+
+
+def _json_packrat() -> Callable[[str], Any]:
+    from demo.demo_json_parser import JsonParser
+    from simpleparser import ParseContext, choice
+    parser = JsonParser()
+    document = choice(parser.obj, parser.ary)
+    return lambda text: ParseContext(memo=True).exec(document, text)
+
+
+def _json_adaptive() -> Callable[[str], Any]:
+    from demo.demo_json_parser import JsonParser
+    from simpleparser import AdaptiveContext, choice
+    parser = JsonParser()
+    document = choice(parser.obj, parser.ary)
+    return lambda text: AdaptiveContext().exec(document, text)
+
+
+NUMERIC_SCHEMA = [("id", int), ("price", float), ("quantity", int)]
+
+
+def _numeric_rows() -> Callable[[str], Any]:
+    from simpleparser import many
+    from simpleparser.builtin_parsers import csv_record
+    records = many(csv_record())
+
+    def parse(text: str) -> Any:
+        rows = records.exec(text).tokens
+        return [[int(a), float(b), int(c)] for a, b, c in rows]
+    return parse
+
+
+def _numeric_columns() -> Callable[[str], Any]:
+    from simpleparser.builtin_parsers import csv_record
+    record = csv_record()
+    return lambda text: record.exec_columns(text, NUMERIC_SCHEMA)
+
+
+def _ambiguous_grammar() -> Any:
+    from simpleparser import choice, lazy, seq, token
+    a = token("a")
+    s = choice(seq(a, lazy(lambda: s), token("b")), seq(a, lazy(lambda: s)), a)
+    return s
+
+
+def _ambiguous_backtrack() -> Callable[[str], Any]:
+    s = _ambiguous_grammar()
+    return lambda text: [s.exec(line) for line in text.splitlines()]
+
+
+def _ambiguous_earley() -> Callable[[str], Any]:
+    from simpleparser import EarleyParser
+    parser = EarleyParser(_ambiguous_grammar())
+    return lambda text: [parser.exec(line) for line in text.splitlines()]
+
+
+def _ambiguous_adaptive() -> Callable[[str], Any]:
+    from simpleparser import AdaptiveContext
+    s = _ambiguous_grammar()
+
+    def parse(text: str) -> Any:
+        context = AdaptiveContext()
+        return [context.exec(s, line) for line in text.splitlines()]
+    return parse
+
+
+def _scheme_parse() -> Callable[[str], Any]:
+    from demo.demo_scheme_parser import schemeparser
+    return schemeparser().parse
+
+
+# name -> (corpus generator, parse function factory)
+CASES: Dict[str, Tuple[Callable[[int], str], Callable[[], Callable[[str], Any]]]] = {
+    "csv": (csv_corpus, _csv_parse),
+    "records-exec": (record_corpus, _records_exec),
+    "records-batch": (record_corpus, _records_batch),
+    "json": (json_corpus, _json_parse),
+    "json-two-pass": (json_corpus, _json_two_pass),
+    "json-values": (json_corpus, _json_values),
+    "json-packrat": (json_corpus, _json_packrat),
+    "json-adaptive": (json_corpus, _json_adaptive),
+    "numeric-rows": (numeric_corpus, _numeric_rows),
+    "numeric-columns": (numeric_corpus, _numeric_columns),
+    "ambiguous-backtrack": (ambiguous_corpus, _ambiguous_backtrack),
+    "ambiguous-earley": (ambiguous_corpus, _ambiguous_earley),
+    "ambiguous-adaptive": (ambiguous_corpus, _ambiguous_adaptive),
+    "scheme": (scheme_corpus, _scheme_parse),
+}
+
+
+def measure(parse: Callable[[str], Any], text: str, repeat: int = 3) -> Result:
+    """Measure one parse function on one input.
+
+    Returns the best throughput of repeat runs in characters per second
+    and the number of lines (records) of the input,
+    the tracemalloc peak in bytes of one run, and the number of memory
+    blocks still allocated after that run (the result and what it keeps).
+
+    Example
+    -------
+    >>> from simpleparser import regex
+    >>> r = measure(regex(r"a+").exec, "a" * 100, repeat=1)
+    >>> sorted(r)
+    ['allocations', 'bytes', 'bytes_per_sec', 'peak_memory', 'records', 'seconds', 'success']
+    """  # noqa: E501
+    best = float("inf")
+    result: Any = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = parse(text)
+        best = min(best, perf_counter() - start)
+    success = bool(getattr(result, "success", True))
+    del result
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = parse(text)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocations = sum(max(stat.count_diff, 0)
+                      for stat in after.compare_to(before, "lineno"))
+    del result
+
+    return {
+        "bytes": len(text),
+        "records": text.count("\n"),
+        "seconds": best,
+        "bytes_per_sec": len(text) / best if best > 0 else float("inf"),
+        "peak_memory": peak,
+        "allocations": allocations,
+        "success": success,
+    }
+
+
+def run(cases: Optional[List[str]] = None,
+        sizes: Optional[List[int]] = None,
+        repeat: int = 3) -> Dict[str, Result]:
+    """Run the benchmark cases and return results keyed by "case/size"."""
+    results: Dict[str, Result] = {}
+    for name in cases or list(CASES):
+        corpus, factory = CASES[name]
+        parse = factory()
+        for size in sizes or DEFAULT_SIZES:
+            results[f"{name}/{size}"] = measure(parse, corpus(size), repeat)
+    return results
+
+
+def compare(results: Dict[str, Result], baseline: Dict[str, Result],
+            threshold: float) -> List[str]:
+    """Return regressions of results against baseline.
+
+    A case regresses when its throughput drops, or its peak memory or
+    allocations grow, by more than threshold (a ratio, 0.2 = 20%).
+
+    Example
+    -------
+    >>> base = {"csv/10": {"bytes_per_sec": 100.0, "peak_memory": 10, "allocations": 5}}
+    >>> now = {"csv/10": {"bytes_per_sec": 70.0, "peak_memory": 11, "allocations": 5}}
+    >>> compare(now, base, 0.2)
+    ['csv/10: bytes_per_sec 100 -> 70 (-30.0%)']
+    >>> compare(now, base, 0.5)
+    []
+    """  # noqa: E501
+    regressions: List[str] = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        checks = [("bytes_per_sec", -1), ("peak_memory", 1), ("allocations", 1)]
+        for metric, sign in checks:
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change * sign > threshold:
+                regressions.append(f"{key}: {metric} {before:.0f} -> {after:.0f}"
+                                   f" ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the suite from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m benchmark",
+                                     description=__doc__)
+    parser.add_argument("cases", nargs="*",
+                        help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed regression ratio (default: 0.2)")
+    parser.add_argument("--save", action="store_true",
+                        help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case: {', '.join(unknown)}")
+
+    results = run(args.cases, args.sizes, args.repeat)
+    for key, r in results.items():
+        print(f"{key:<20}{r['bytes_per_sec']:>14,.0f} B/s"
+              f"{r['peak_memory']:>14,} B peak{r['allocations']:>10,} allocs"
+              f"{r['seconds'] / r['records'] * 1e6 if r['records'] else 0:>10.1f} us/record"
+              f"{'' if r['success'] else '  (parse failed)'}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save to create one")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
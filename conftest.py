@@ -0,0 +1,18 @@
+"""pytest configuration."""
+
+import importlib.util
+from typing import List
+import pytest
+
+# modules whose doctests need NumPy.
+NUMPY_DOCTESTS = ("simpleparser.structural",)
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]) -> None:
+    """Skip the doctests needing NumPy when it is not installed."""
+    if importlib.util.find_spec("numpy") is not None:
+        return
+    skip = pytest.mark.skip(reason="numpy is not installed")
+    for item in items:
+        if isinstance(item, pytest.DoctestItem) and item.name.startswith(NUMPY_DOCTESTS):
+            item.add_marker(skip)
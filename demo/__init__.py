@@ -0,0 +1 @@
+"""demo parsers of simpleparser."""
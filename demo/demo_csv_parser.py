@@ -2,10 +2,10 @@
 
 from typing import List
 from simpleparser import (
-    token, sep_by, end_by, transform, seq, many, choice, none_of,
+    token, sep_by, end_by, transform, seq, choice,
     ParseResult
 )
-from simpleparser.builtin_parsers import newline
+from simpleparser.builtin_parsers import newline, csv_field
 
 
 class CsvParser():
@@ -47,20 +47,14 @@ class CsvParser():
     [['"Product"', '"Price"'], ['"O\'Reilly Socks"', '10'], ['"Shirt with ""Haskell"" text"', '20'], ['"Shirt, ""O\'Reilly"" version"', '20'], ['"Haskell Caps"', '15']]
     """  # noqa E501
 
-    def parse(self, s: str) -> ParseResult:
-        """Parse method."""
-        dq = token('"')
-        assert dq.exec('"foo"').tokens == ['"']
-
-        dq_escaped = token('""')
-
-        chars = transform(many(choice(dq_escaped, none_of('",\n\r'))), lambda x: ["".join(x)])  # noqa E501
-        assert chars.exec("cell1,cell2").tokens[0] == 'cell1'  # noqa E501
-
-        quoted_chars = transform(seq(dq, many(choice(dq_escaped, none_of('"'))), dq), lambda x: ["".join(x)])  # noqa E501
-        assert quoted_chars.exec('"ce ""ll"" 1",cell2').tokens[0] == '"ce ""ll"" 1"'  # noqa E501
-
-        cell = transform(choice(quoted_chars, chars), lambda x: ["".join(x)])  # noqa E501
+    def __init__(self) -> None:
+        """Build the grammar once."""
+        # one regex doing the work of the combinators
+        #   dq_escaped = token('""')
+        #   chars = many(choice(dq_escaped, none_of('",\n\r')))
+        #   quoted_chars = seq(token('"'), many(choice(dq_escaped, none_of('"'))), token('"'))  # noqa E501
+        #   cell = choice(quoted_chars, chars)  (each joined by transform)
+        cell = csv_field()
         assert cell.exec('"ce ""ll"" 1",cell2').tokens == ['"ce ""ll"" 1"']  # noqa E501
         assert cell.exec('cell1,cell2').tokens == ['cell1']  # noqa E501
 
@@ -82,13 +76,16 @@ class CsvParser():
         assert eol.exec('123456789\nline2\n', 9).tokens == ["\n"], eol.exec('123456789\nline2\n', 9)  # noqa E501
         assert eol.exec('"ce ""ll"" 1",cell2\nline2\n', 19).tokens == ["\n"], eol.exec('"ce ""ll"" 1",cell2\nline2\n', 19)  # noqa E501
         assert eol.exec('"ce ""ll"" 1",cell2\nline2\n', 25).tokens == ["\n"], eol.exec('"ce ""ll"" 1",cell2\nline2\n', 25)  # noqa E501
-        parser = end_by(line, eol)
-        assert parser.exec('"ce ""ll"" 1",cell2\nline2\n').tokens == [['"ce ""ll"" 1"', "cell2"], ["line2"]]  # noqa E501
+        self.line = line
+        self.parser = end_by(line, eol)
+        assert self.parser.exec('"ce ""ll"" 1",cell2\nline2\n').tokens == [['"ce ""ll"" 1"', "cell2"], ["line2"]]  # noqa E501
         # s = '"Product","Price"\n"O\'Reilly Socks",10\n"Shirt with ""Haskell"" text",20\n"Shirt ""O\'Reilly"" version",20\n"Haskell Caps",15\n'  # noqa E501
         # tmp = parser.exec(s)
         # assert tmp.tokens == [["Product","Price"],["O'Reilly Socks","10"],["Shirt with \"Haskell\" text","20"],["Shirt, \"O'Reilly\" version","20"],["Haskell Caps","15"]], tmp  # noqa E501
 
-        return parser.exec(s, 0)
+    def parse(self, s: str) -> ParseResult:
+        """Parse method."""
+        return self.parser.exec(s, 0)
 
 
 if __name__ == "__main__":
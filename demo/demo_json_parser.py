@@ -1,7 +1,7 @@
 """csv parsing sample."""
 
 from simpleparser import (
-    token, regex, choice, seq, lazy, sep_by, option, transform,
+    token, regex, choice, seq, lazy, sep_by, option, transform, skip,
     ParseResult
 )
 
@@ -28,8 +28,8 @@ class JsonParser:
     ['{', 'p1', ':', '1', 'p2', ':', "'a'", 'p3', ':', '[', ']', '}']
     """
 
-    def parse(self, s: str) -> ParseResult:
-        """Parse method."""
+    def __init__(self) -> None:
+        """Build the grammar once."""
         propName = regex(r"\w+")
         colon = token(":")
         sq = token("'")
@@ -40,10 +40,59 @@ class JsonParser:
         ary = seq(token("["), option(sep_by(p_multi, token(","))), token("]"))  # noqa: E501
         obj = seq(token("{"), option(sep_by(seq(propName, colon, p_multi), token(","))), token("}"))  # noqa: E501
 
+        self.ary = ary
+        self.obj = obj
+
+    def parse(self, s: str) -> ParseResult:
+        """Parse method."""
+        if s.lstrip()[0] == '[':
+            return self.ary.exec(s, 0)
+        else:
+            return self.obj.exec(s, 0)
+
+
+class JsonValueParser:
+    """Json parser building Python values.
+
+    The same grammar as JsonParser, with semantic actions building
+    dicts, lists, ints and strs during the parse.
+
+    Example
+    -------
+    >>> p = JsonValueParser()
+    >>> p.parse("{}")
+    [{}]
+    >>> p.parse("{p1:1,p2:{p1:1}}")
+    [{'p1': 1, 'p2': {'p1': 1}}]
+    >>> p.parse("[[1,2,3],[2],[3]]")
+    [[[1, 2, 3], [2], [3]]]
+    >>> p.parse("{p1:1,p2:'a',p3:[]}").tokens[0]
+    {'p1': 1, 'p2': 'a', 'p3': []}
+    """
+
+    def __init__(self) -> None:
+        """Build the grammar once."""
+        propName = regex(r"\w+")
+        colon = skip(token(":"))
+        comma = skip(token(","))
+        sq = skip(token("'"))
+        dq = skip(token('"'))
+        p_str = choice(seq(dq, regex(r"\w*"), dq), seq(sq, regex(r"\w*"), sq))
+        num = regex(r"\d+").map_to(int)
+        p_multi = choice(num, p_str, lazy(lambda: obj), lazy(lambda: ary))
+        ary = seq(skip(token("[")), option(sep_by(p_multi, comma)), skip(token("]"))).collect(list)  # noqa: E501
+        member = seq(propName, colon, p_multi).map_to(lambda k, v: (k, v))
+        obj = seq(skip(token("{")), option(sep_by(member, comma)), skip(token("}"))).collect(dict)  # noqa: E501
+
+        self.ary = ary
+        self.obj = obj
+
+    def parse(self, s: str) -> ParseResult:
+        """Parse method."""
         if s.lstrip()[0] == '[':
-            return ary.exec(s, 0)
+            return self.ary.exec(s, 0)
         else:
-            return obj.exec(s, 0)
+            return self.obj.exec(s, 0)
 
 
 if __name__ == "__main__":
@@ -6,23 +6,24 @@ import simpleparser as p
 class schemeparser:
     """Schemeparser class.
 
-    # TODO: doctest
-    # >>> parser = schemeparser()
-    # >>> parser.parse("( + 1 7 )").result()
-    # [True, ['(', '+', ' ', '1', ' ', '7', ')'], 7]
-    # >>> parser.parse("( + 1 ( - 2 3 ) )").result()
-    # [True, ['(', '+', ' ', '1', ' ', '(', ' ', '-', ' ', '2', ' ', '3', ')', ')'], 13]
-    # >>> parser.parse("( + 1 ( - 2 ( + 3 4 ) ) )").result()
-    # [True, ['(', '+', ' ', '1', ' ', '(', ' ', '-', ' ', '2', ' ', '3', ')', ')'], 13]
+    Example
+    -------
+    >>> parser = schemeparser()
+    >>> parser.parse("( + 1 7 )")
+    ['(', ' ', '+', ' ', '1', ' ', '7', ' ', ')']
+    >>> parser.parse("(+ 1 (- 2 3))")
+    ['(', '+', ' ', '1', ' ', '(', '-', ' ', '2', ' ', '3', ')', ')']
+    >>> parser.parse("(+ 1 (- 2 (+ 3 4)))").position
+    19
     """  # noqa: E501
 
-    def parse(self, s: str) -> p.ParseResult:
-        """Parse method."""
+    def __init__(self) -> None:
+        """Build the grammar once."""
         l_paren = p.token("(")
         r_paren = p.token(")")
-        symbol = p.regex(r"\S")
-        blank = p.regex(r"\s")
-        # opt_blank = p.option(blank)
+        symbol = p.regex(r"[^\s()]+")
+        blank = p.regex(r"\s+")
+        opt_blank = p.option(blank)
 
         # operator = symbol
         # num = symbol
@@ -31,18 +32,19 @@ class schemeparser:
         # expression = p.seq(atom, p.many(p.seq(operator, atom)))
         # parser = expression
 
-        exp = p.lazy(lambda:
-                     p.seq(l_paren,
-                           blank,
-                           symbol,
-                           p.many(
-                               p.seq(blank, p.choice(symbol, exp), blank)
-                               ),
-                           blank,
-                           r_paren)
-                     )
-        parser = exp
-        return parser.exec(s, 0)
+        exp = p.seq(l_paren,
+                    opt_blank,
+                    symbol,
+                    p.option(p.many(
+                        p.seq(blank, p.choice(symbol, p.lazy(lambda: exp)))
+                        )),
+                    opt_blank,
+                    r_paren)
+        self.parser = exp
+
+    def parse(self, s: str) -> p.ParseResult:
+        """Parse method."""
+        return self.parser.exec(s, 0)
 
 
 if __name__ == "__main__":
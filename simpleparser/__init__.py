@@ -1,15 +1,27 @@
 """simpleparser."""
 
-from simpleparser.parseresult import ParseResult, Success, Failure  # noqa F401
+from simpleparser.parseresult import ParseResult, Success, Failure, Recovered, BudgetExceeded, BatchResult, TokenRope  # noqa F401
 from simpleparser.parser import Parser  # noqa F401
-from simpleparser.prim import token, regex, none_of  # noqa F401
-from simpleparser.comb import many, choice, seq, option, transform, sep_by, end_by, lazy  # noqa F401
+from simpleparser.lines import LineIndex  # noqa F401
+from simpleparser.columnar import Columns  # noqa F401
+from simpleparser.structural import StructuralIndex  # noqa F401
+from simpleparser.context import ParseContext  # noqa F401
+from simpleparser.prim import token, regex, none_of, take_until, skip_until, skip_while  # noqa F401
+from simpleparser.comb import many, choice, seq, option, transform, sep_by, end_by, skip, recover, lazy  # noqa F401
+from simpleparser.analysis import NullableLoopWarning  # noqa F401
+from simpleparser.earley import EarleyParser  # noqa F401
+from simpleparser.cache import ResultCache  # noqa F401
+from simpleparser.adaptive import AdaptiveContext, MemoPlan  # noqa F401
+from simpleparser.incremental import IncrementalParser  # noqa F401
+from simpleparser.profiler import Profiler  # noqa F401
+from simpleparser.streaming import aparse  # noqa F401
 from simpleparser import builtin_parsers  # noqa F401
 
 __all__ = [
-    "ParseResult", "Success", "Failure",
-    "Parser",
-    "token", "regex", "none_of",
-    "many", "choice", "seq", "option", "transform", "sep_by", "end_by", "lazy",
+    "ParseResult", "Success", "Failure", "Recovered", "BudgetExceeded", "BatchResult", "TokenRope",
+    "Parser", "ParseContext", "AdaptiveContext", "MemoPlan", "LineIndex", "Columns", "StructuralIndex",
+    "token", "regex", "none_of", "take_until", "skip_until", "skip_while",
+    "many", "choice", "seq", "option", "transform", "sep_by", "end_by", "skip", "recover", "lazy",
+    "NullableLoopWarning", "EarleyParser", "ResultCache", "IncrementalParser", "Profiler", "aparse",
     "builtin_parsers",
 ]
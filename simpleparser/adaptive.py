@@ -0,0 +1,181 @@
+"""an adaptive memoization module."""
+
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from simpleparser.analysis import walk
+from simpleparser.cache import fingerprint
+from simpleparser.context import ParseContext
+from simpleparser.parser import Parser, PrimitiveParser
+from simpleparser.parseresult import ParseResult
+
+if TYPE_CHECKING:  # pragma: no cover
+    from simpleparser.structural import StructuralIndex
+
+
+class MemoPlan:
+    """Memo plan class.
+
+    The grammar nodes worth memoizing, as indices in the walk order of
+    the grammar, with the fingerprint of the grammar they belong to, so
+    a plan learned by one run can be saved and given to later runs.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq, choice
+    >>> p = choice(seq(token("a"), token("b")), token("a"))
+    >>> plan = MemoPlan.of(p, [p.children()[0]])
+    >>> plan.nodes
+    [1]
+    >>> plan.bind(p) == {p.children()[0]}
+    True
+    """
+
+    def __init__(self, grammar: str, nodes: Iterable[int]) -> None:
+        """Initialize method."""
+        self.grammar: str = grammar
+        self.nodes: List[int] = sorted(nodes)
+
+    @classmethod
+    def of(cls, parser: Parser, memoized: Iterable[Parser]) -> "MemoPlan":
+        """Return the plan memoizing the nodes memoized of the grammar of parser."""  # noqa: E501
+        selected = set(memoized)
+        return cls(fingerprint(parser),
+                   [k for k, p in enumerate(walk(parser)) if p in selected])
+
+    def bind(self, parser: Parser) -> Set[Parser]:
+        """Return the nodes of the grammar of parser to memoize.
+
+        Raises ValueError if the plan was made for another grammar.
+        """
+        if fingerprint(parser) != self.grammar:
+            raise ValueError("the memo plan was made for another grammar")
+        parsers = list(walk(parser))
+        return {parsers[k] for k in self.nodes}
+
+    def dump(self, path: str) -> None:
+        """Write the plan as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"grammar": self.grammar, "nodes": self.nodes}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "MemoPlan":
+        """Read a plan written by dump."""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["grammar"], data["nodes"])
+
+    def __repr__(self) -> str:
+        """Return string."""
+        return f"MemoPlan({self.grammar[:12]}, nodes={self.nodes})"
+
+
+class AdaptiveContext(ParseContext):
+    """Adaptive memoization context class.
+
+    Memoizes only the grammar nodes which are re-invoked at the same
+    position often, instead of every node (``ParseContext(memo=True)``).
+    Every invocation at a sampled position (a multiple of ``sample``)
+    is recorded; once a node has ``min_calls`` sampled invocations of
+    which at least ``threshold`` are repeats, it is memoized from then
+    on, in this and later parses of the context.
+    So a grammar which rarely backtracks runs almost as fast as without
+    memo, and one which backtracks exponentially is memoized after a
+    few sampled positions. Primitives are never memoized.
+
+    ``memo_plan`` exports the chosen nodes as a MemoPlan; a context
+    given a plan memoizes its nodes from the start, and with
+    ``sample=None`` does not sample at all.
+
+    Parameters
+    ----------
+    threshold
+        The ratio of repeated invocations memoizing a node.
+    min_calls
+        The number of sampled invocations of a node before it is judged.
+    sample
+        The distance of the sampled positions, or None not to sample.
+    plan
+        A MemoPlan of the grammar to parse.
+
+    The budget parameters are those of ParseContext.
+
+    Example
+    -------
+    >>> from simpleparser import token, choice, seq, lazy
+    >>> a = token("a")
+    >>> s = choice(seq(a, lazy(lambda: s), token("b")), seq(a, lazy(lambda: s)), a)
+    >>> ctx = AdaptiveContext()
+    >>> len(ctx.exec(s, "a" * 60).tokens)
+    60
+    >>> sorted(p.parser_type for p in ctx.memoized)
+    ['choice', 'lazy', 'seq', 'seq']
+    >>> plan = ctx.memo_plan(s)
+    >>> len(AdaptiveContext(plan=plan, sample=None).exec(s, "a" * 60).tokens)
+    60
+    """
+
+    def __init__(self, threshold: float = 0.25, min_calls: int = 16,
+                 sample: Optional[int] = 4,
+                 plan: Optional[MemoPlan] = None,
+                 max_steps: Optional[int] = None,
+                 max_memo: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 structural: Optional["StructuralIndex"] = None) -> None:
+        """Initialize method."""
+        super().__init__(memo=True, max_steps=max_steps, max_memo=max_memo,
+                         timeout=timeout, structural=structural)
+        self.threshold: float = threshold
+        self.min_calls: int = min_calls
+        self.sample: Optional[int] = sample
+        self.plan: Optional[MemoPlan] = plan
+        self.memoized: Set[Parser] = set()
+        # sampled invocations and repeats, per node
+        self.counts: Dict[Parser, List[int]] = {}
+        self._seen: Set[Tuple[Parser, int]] = set()
+        self._bound: Optional[Parser] = None
+
+    def reset(self, s: str) -> None:
+        """Prepare the context for parsing s."""
+        if s is not self.target:
+            self._seen.clear()
+        super().reset(s)
+
+    def exec(self, parser: Parser, s: str, i: int = 0) -> ParseResult:
+        """Execute the parser with this context active."""
+        if self.plan is not None and parser is not self._bound:
+            self.memoized |= self.plan.bind(parser)
+            self._bound = parser
+        return super().exec(parser, s, i)
+
+    def apply(self, parser: Parser, s: str, i: int) -> ParseResult:
+        """Run one parser at one position on behalf of Parser.exec."""
+        if parser in self.memoized:
+            return super().apply(parser, s, i)
+        if i > self.furthest:
+            self.furthest = i
+        self.steps += 1
+        if self.steps >= self._check_at:
+            self._check()
+        if self.sample is not None and i % self.sample == 0:
+            self._observe(parser, i)
+        return parser.run(s, i)
+
+    def _observe(self, parser: Parser, i: int) -> None:
+        """Record a sampled invocation and memoize parser if it repeats often."""  # noqa: E501
+        counts = self.counts.get(parser)
+        if counts is None:
+            if isinstance(parser, PrimitiveParser):
+                return
+            counts = self.counts[parser] = [0, 0]
+        counts[0] += 1
+        key = (parser, i)
+        if key not in self._seen:
+            self._seen.add(key)
+            return
+        counts[1] += 1
+        if counts[0] >= self.min_calls and counts[1] >= self.threshold * counts[0]:
+            self.memoized.add(parser)
+
+    def memo_plan(self, parser: Parser) -> MemoPlan:
+        """Return the plan of the nodes memoized so far in the grammar of parser."""  # noqa: E501
+        return MemoPlan.of(parser, self.memoized)
@@ -0,0 +1,156 @@
+"""a grammar analysis module."""
+
+import os
+import sys
+import warnings
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from simpleparser.parser import Parser, PrimitiveParser
+
+
+class NullableLoopWarning(UserWarning):
+    """A repetition over parsers which may all succeed without consuming input."""
+
+
+def children_of(parser: Parser) -> Optional[Tuple[Parser, ...]]:
+    """Return the sub-parsers of parser, or None if they are unknown yet.
+
+    The target of a lazy parser is unknown while its callback fails,
+    e.g. with a NameError, an AttributeError or a KeyError because the
+    variable, attribute or entry it reads is not defined yet.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq, lazy
+    >>> grammar = {}
+    >>> p = seq(token("a"), lazy(lambda: grammar["b"]))
+    >>> children_of(p)[1].parser_type, children_of(children_of(p)[1])
+    ('lazy', None)
+    >>> grammar["b"] = token("b")
+    >>> children_of(children_of(p)[1])[0].expression
+    'b'
+    """
+    try:
+        return parser.children()
+    except Exception:
+        return None
+
+
+def walk(parser: Parser) -> Iterator[Parser]:
+    """Yield every parser reachable from parser once, parser first.
+
+    Lazy parsers whose target is unknown yet (see children_of) are not
+    followed.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq, option
+    >>> foo = token("foo")
+    >>> [p.parser_type for p in walk(seq(foo, option(foo)))]
+    ['seq', 'token', 'option']
+    """
+    seen: Set[Parser] = set()
+    stack: List[Parser] = [parser]
+    while stack:
+        p = stack.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        yield p
+        children = children_of(p)
+        if children is not None:
+            stack.extend(reversed(children))
+
+
+def _any(flags: List[bool]) -> bool:
+    return any(flags)
+
+
+def _all(flags: List[bool]) -> bool:
+    return all(flags)
+
+
+def _always(flags: List[bool]) -> bool:
+    return True
+
+
+# how a parser of each kind is nullable, from its children.
+_RULES: Dict[str, Callable[[List[bool]], bool]] = {
+    "seq": _all,
+    "choice": _any,
+    "option": _always,
+    "sep_by": _always,
+    "end_by": _always,
+    "recover": _always,
+    "many": _all,
+    "transform": _all,
+    "skip": _all,
+    "lazy": _all,
+    "map_to": _all,
+    "collect": _all,
+}
+
+
+def nullable(parser: Parser) -> bool:
+    """Return whether parser may succeed without consuming input.
+
+    Computed as a fixpoint over the grammar graph, so recursive
+    grammars built with lazy are handled. A parser of an unknown kind,
+    or a lazy parser whose target is unknown yet, is assumed to consume
+    input: the loops over it check their progress at parse time.
+
+    Example
+    -------
+    >>> from simpleparser import token, regex, seq, choice, option
+    >>> nullable(token("a")), nullable(regex("a*")), nullable(option(token("a")))
+    (False, True, True)
+    >>> nullable(seq(option(token("a")), choice(token("b"), regex(" *"))))
+    True
+    """
+    parsers = list(walk(parser))
+    result: Dict[Parser, bool] = {
+        p: isinstance(p, PrimitiveParser) and p.nullable for p in parsers}
+    changed = True
+    while changed:
+        changed = False
+        for p in parsers:
+            rule = _RULES.get(p.parser_type)
+            if result[p] or rule is None or isinstance(p, PrimitiveParser):
+                continue
+            children = children_of(p)
+            if children and rule([result.get(c, False) for c in children]):
+                result[p] = changed = True
+    return result[parser]
+
+
+def check_loop(name: str, *parsers: Parser) -> None:
+    """Warn if one iteration of the loop name over parsers may consume nothing.
+
+    Example
+    -------
+    >>> import warnings
+    >>> from simpleparser import option, token
+    >>> with warnings.catch_warnings(record=True) as w:
+    ...     warnings.simplefilter("always")
+    ...     check_loop("many", option(token("a")))
+    >>> print(w[0].message)
+    many over a nullable parser (option) may match the empty string forever
+    """
+    if all(nullable(p) for p in parsers):
+        kinds = ", ".join(p.parser_type for p in parsers)
+        warnings.warn(f"{name} over a nullable parser ({kinds})"
+                      " may match the empty string forever",
+                      NullableLoopWarning, stacklevel=_stacklevel())
+
+
+# the directory of the package, whose frames warnings skip.
+_PACKAGE = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+def _stacklevel() -> int:
+    """Return the stacklevel of a warning of check_loop at the first frame out of the package."""  # noqa: E501
+    level = 2
+    frame = sys._getframe(level)
+    while frame.f_back is not None and frame.f_code.co_filename.startswith(_PACKAGE):  # noqa: E501
+        frame = frame.f_back
+        level += 1
+    return level
@@ -0,0 +1,392 @@
+"""a parse result cache module."""
+
+import hashlib
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import types
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+from simpleparser.analysis import children_of, walk
+from simpleparser.context import ParseContext
+from simpleparser.parser import Parser
+from simpleparser.parseresult import ParseResult, Success, Failure, Recovered, BudgetExceeded
+
+
+Key = Tuple[str, str, int]                   # grammar, input digest, position
+
+
+def fingerprint(parser: Parser) -> str:
+    """Return a digest of the grammar of parser.
+
+    Every reachable parser contributes its kind, its expression, its
+    children and the functions it runs: their qualified names, bytecode
+    and constants, the values they close over and the globals they
+    read. So two grammars built by the same code have the same
+    fingerprint, and changing a selector of transform changes it.
+    Plain values (numbers, strings, patterns, containers of them,
+    classes, modules) are hashed by value, and the fingerprint is
+    stable across processes. Any other object, e.g. the instance of a
+    bound method, is hashed by identity, which makes the fingerprint
+    differ in another process; its state is assumed not to change.
+
+    Raises ValueError when the grammar holds an object which is hashed
+    by identity but cannot be weakly referenced (e.g. a dict in a
+    closure), as its identity could be reused by another object.
+
+    Example
+    -------
+    >>> from simpleparser import token, transform
+    >>> fingerprint(transform(token("a"), str.upper)) == fingerprint(transform(token("a"), str.upper))
+    True
+    >>> fingerprint(transform(token("a"), str.upper)) == fingerprint(transform(token("a"), str.lower))
+    False
+    """  # noqa: E501
+    return _fingerprint(parser)[0]
+
+
+def _fingerprint(parser: Parser) -> Tuple[str, bool]:
+    """Return the fingerprint of parser and whether it is stable across processes."""  # noqa: E501
+    parsers = list(walk(parser))
+    state = _Fingerprinter(parsers)
+    digest = hashlib.sha256()
+    for p in parsers:
+        children = children_of(p)
+        nodes = ["<undefined>"] if children is None else [f"#{state.index[c]}" for c in children]  # noqa: E501
+        digest.update(repr((p.parser_type, p.expression, nodes)).encode())
+        state.seen.clear()
+        for value in vars(p).values():
+            if callable(value):
+                for part in state.parts(value):
+                    digest.update(part.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest(), not state.local
+
+
+# values described by their repr.
+_ATOMS = (type(None), bool, int, float, complex, str, bytes)
+# built-in functions and methods of classes, described by their names.
+_NAMED = (types.BuiltinFunctionType, types.MethodDescriptorType,
+          types.WrapperDescriptorType, types.ClassMethodDescriptorType, type)
+
+_identities: Dict[int, Tuple["weakref.ref[Any]", int]] = {}
+_identities_lock = threading.Lock()
+_serials = itertools.count()
+
+
+def _identity(value: Any) -> str:
+    """Describe value by its identity, guarded against the reuse of its id."""
+    key = id(value)
+    with _identities_lock:
+        entry = _identities.get(key)
+        if entry is None or entry[0]() is not value:
+            def forget(ref: "weakref.ref[Any]") -> None:
+                with _identities_lock:
+                    if _identities.get(key, (None,))[0] is ref:
+                        del _identities[key]
+            try:
+                ref = weakref.ref(value, forget)
+            except TypeError:
+                raise ValueError(f"cannot fingerprint {type(value).__name__} object") from None  # noqa: E501
+            entry = _identities[key] = (ref, next(_serials))
+    return f"<{type(value).__qualname__} {key}#{entry[1]}>"
+
+
+class _Fingerprinter:
+    """the state of one fingerprint: the grammar and the functions seen."""
+
+    def __init__(self, parsers: List[Parser]) -> None:
+        self.index: Dict[Parser, int] = {p: k for k, p in enumerate(parsers)}
+        self.seen: Set[int] = set()
+        # whether an object was hashed by identity.
+        self.local: bool = False
+
+    def parts(self, value: Any) -> Iterator[str]:
+        """Yield strings describing value for fingerprint."""
+        if isinstance(value, _ATOMS):
+            yield repr(value)
+        elif isinstance(value, re.Pattern):
+            # the repr of a long pattern is truncated.
+            yield repr((value.pattern, value.flags))
+        elif isinstance(value, Parser) and value in self.index:
+            yield f"#{self.index[value]}"
+        elif isinstance(value, (types.FunctionType, types.MethodType)):
+            yield from self._function(value)
+        elif isinstance(value, _NAMED) or (isinstance(value, types.BuiltinMethodType)
+                                           and isinstance(value.__self__, types.ModuleType)):  # noqa: E501
+            yield f"{getattr(value, '__module__', None)}.{value.__qualname__}"
+        elif isinstance(value, (types.BuiltinMethodType, types.MethodWrapperType)):
+            # e.g. the match method of a compiled pattern.
+            yield value.__qualname__
+            yield from self.parts(value.__self__)
+        elif isinstance(value, types.ModuleType):
+            yield f"<module {value.__name__}>"
+        else:
+            yield from self._container(value)
+
+    def _container(self, value: Any) -> Iterator[str]:
+        if isinstance(value, (list, tuple)):
+            yield f"<{type(value).__name__} {len(value)}>"
+            for item in value:
+                yield from self.parts(item)
+        elif isinstance(value, dict):
+            yield f"<dict {len(value)}>"
+            for item in value.items():
+                yield from self.parts(item)
+        elif isinstance(value, (set, frozenset)):
+            # sets of strings are ordered by their hashes, which vary per process.
+            yield repr(sorted("".join(self.parts(item)) for item in value))
+        else:
+            self.local = True
+            yield _identity(value)
+
+    def _function(self, value: Any) -> Iterator[str]:
+        if id(value) in self.seen:
+            yield "<recursive>"
+            return
+        self.seen.add(id(value))
+        if isinstance(value, types.MethodType):
+            yield from self.parts(value.__self__)
+            value = value.__func__
+        yield value.__qualname__
+        yield from _code_parts(value.__code__)
+        yield from self.parts(value.__defaults__)
+        yield from self.parts(value.__kwdefaults__)
+        for cell in value.__closure__ or ():
+            try:
+                contents = cell.cell_contents
+            except ValueError:
+                yield "<empty>"
+                continue
+            yield from self.parts(contents)
+        for name in _global_names(value.__code__):
+            if name in value.__globals__:
+                yield name
+                yield from self._global(value.__globals__[name])
+
+    def _global(self, value: Any) -> Iterator[str]:
+        """Describe a global read by a function; functions and classes by name."""  # noqa: E501
+        if isinstance(value, (types.FunctionType, type)):
+            yield f"{value.__module__}.{value.__qualname__}"
+        else:
+            yield from self.parts(value)
+
+
+def _global_names(code: types.CodeType) -> Iterator[str]:
+    """Yield the names code and its nested functions may read as globals."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _global_names(const)
+
+
+def _code_parts(code: types.CodeType) -> Iterator[str]:
+    yield code.co_code.hex()
+    yield repr(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_parts(const)
+        else:
+            yield repr(const)
+
+
+def _dump(result: ParseResult) -> Optional[str]:
+    """Serialize result as JSON, or return None if its tokens do not round-trip."""  # noqa: E501
+    record: Dict[str, Any] = {"success": result.success,
+                              "position": result.position, "name": result.name}
+    if result.success:
+        record["tokens"] = result.tokens
+    else:
+        record["message"] = result.message
+    if isinstance(result, Recovered):
+        record["errors"] = [[e.message, e.position, e.name] for e in result.errors]
+    try:
+        data = json.dumps(record, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    # tuples would come back as lists, other objects not at all.
+    if result.success and json.loads(data)["tokens"] != result.tokens:
+        return None
+    return data
+
+
+def _load(data: str) -> ParseResult:
+    record = json.loads(data)
+    if "errors" in record:
+        errors = [Failure(message, position, name=name)
+                  for message, position, name in record["errors"]]
+        return Recovered(record["tokens"], record["position"], errors,
+                         name=record["name"])
+    if record["success"]:
+        return Success(record["tokens"], record["position"], name=record["name"])
+    return Failure(record["message"], record["position"], name=record["name"])
+
+
+class ResultCache:
+    """Parse result cache class.
+
+    Caches the result of parsing an input with a grammar, keyed by the
+    fingerprint of the grammar, a digest of the input and the start
+    position, so an input seen before is not parsed again.
+    Results are kept in memory, least recently used first out, and
+    optionally in a directory as compact JSON (status, position and
+    tokens), which survives the process. Results whose tokens do not
+    round-trip through JSON are only kept in memory, as are those of a
+    grammar whose fingerprint is not stable across processes, and a
+    ``BudgetExceeded`` result, which depends on the budget rather than
+    on the input, is never cached. A grammar which cannot be
+    fingerprinted is parsed on every call.
+    Cached results are shared: do not modify them.
+
+    The counters ``hits``, ``disk_hits``, ``misses`` and ``evictions``
+    help sizing the cache. A cache may be shared by many threads.
+
+    Parameters
+    ----------
+    maxsize
+        The number of results kept in memory.
+    directory
+        The directory of the on-disk tier, or None to keep results in
+        memory only. The directory is not size bounded.
+
+    Example
+    -------
+    >>> from simpleparser import regex, sep_by, token
+    >>> p = sep_by(regex("[0-9]+"), token(","))
+    >>> cache = ResultCache(maxsize=1)
+    >>> cache.exec(p, "1,2"), cache.exec(p, "1,2"), cache.exec(p, "3"), cache.exec(p, "1,2")
+    (['1', '2'], ['1', '2'], ['3'], ['1', '2'])
+    >>> cache.hits, cache.misses, cache.evictions
+    (1, 3, 2)
+    """  # noqa: E501
+
+    def __init__(self, maxsize: int = 1024,
+                 directory: Optional[str] = None) -> None:
+        """Initialize method."""
+        self.maxsize: int = maxsize
+        self.directory: Optional[str] = directory
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._results: "OrderedDict[Key, ParseResult]" = OrderedDict()
+        # fingerprint and stability per grammar, None if it cannot be fingerprinted.
+        self._fingerprints: "WeakKeyDictionary[Parser, Optional[Tuple[str, bool]]]" = WeakKeyDictionary()
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def key(self, parser: Parser, s: str, i: int = 0) -> Key:
+        """Return the cache key of parsing s from i with parser.
+
+        Raises ValueError if the grammar cannot be fingerprinted.
+        """
+        grammar = self._grammar(parser)
+        if grammar is None:
+            raise ValueError("the grammar cannot be fingerprinted")
+        digest = hashlib.blake2b(s.encode("utf-8", "surrogatepass"), digest_size=16)
+        return grammar[0], digest.hexdigest(), i
+
+    def _grammar(self, parser: Parser) -> Optional[Tuple[str, bool]]:
+        with self._lock:
+            if parser in self._fingerprints:
+                return self._fingerprints[parser]
+        grammar: Optional[Tuple[str, bool]]
+        try:
+            grammar = _fingerprint(parser)
+        except ValueError:
+            grammar = None
+        with self._lock:
+            self._fingerprints[parser] = grammar
+        return grammar
+
+    def exec(self, parser: Parser, s: str, i: int = 0,
+             context: Optional[ParseContext] = None) -> ParseResult:
+        """Return the cached result of parser on s from i, parsing on a miss.
+
+        A miss is parsed within context, if given.
+        """
+        grammar = self._grammar(parser)
+        if grammar is None:
+            return self._parse(parser, s, i, context)
+        key = self.key(parser, s, i)
+        # the disk tier is shared with other processes.
+        stable = grammar[1]
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._read(key) if stable else None
+        if result is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._remember(key, result)
+            return result
+        result = self._parse(parser, s, i, context)
+        if isinstance(result, BudgetExceeded):
+            return result
+        with self._lock:
+            self._remember(key, result)
+        if stable:
+            self._write(key, result)
+        return result
+
+    def _parse(self, parser: Parser, s: str, i: int,
+               context: Optional[ParseContext]) -> ParseResult:
+        with self._lock:
+            self.misses += 1
+        return parser.exec(s, i) if context is None else context.exec(parser, s, i)
+
+    def _remember(self, key: Key, result: ParseResult) -> None:
+        """Keep result in memory; the lock is held."""
+        self._results[key] = result
+        self._results.move_to_end(key)
+        while len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key: Key) -> str:
+        grammar, digest, i = key
+        return os.path.join(str(self.directory), f"{grammar}-{digest}-{i}.json")
+
+    def _read(self, key: Key) -> Optional[ParseResult]:
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return _load(f.read())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, key: Key, result: ParseResult) -> None:
+        if self.directory is None:
+            return
+        data = _dump(result)
+        if data is None:
+            return
+        # write then rename, so readers never see a partial file.
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(temporary, self._path(key))
+
+    def clear(self) -> None:
+        """Drop the results kept in memory and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of results kept in memory."""
+        return len(self._results)
+
+    def __repr__(self) -> str:
+        """Return string."""
+        return (f"ResultCache({len(self)}/{self.maxsize} results, hits={self.hits}"
+                f" disk_hits={self.disk_hits} misses={self.misses} evictions={self.evictions})")
@@ -0,0 +1,144 @@
+"""a typed columnar output module."""
+
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from simpleparser.parseresult import ParseResult, Failure
+
+
+Schema = Sequence[Tuple[str, type]]
+
+# array typecodes of the numeric column types.
+TYPECODES: Dict[type, str] = {int: "q", float: "d"}
+
+
+class Columns:
+    """Typed columns of records.
+
+    Every record is a sequence of field strings, one per column of the
+    schema. Records are buffered in blocks and each block is converted
+    column by column: int and float columns into array.array (or NumPy
+    arrays with ``numpy=True``), str columns into lists.
+    So a numeric field costs 8 bytes once converted, and the field
+    strings only live as long as their block.
+    A field which does not convert stops the columns at its record:
+    the records before it are kept, ``error`` reports the record at
+    its start position (or its index, when appended without one) and
+    later records are ignored.
+
+    Parameters
+    ----------
+    schema
+        The (name, type) of every column; the type is int, float or str.
+    numpy
+        Convert the numeric columns of each block with NumPy.
+    block
+        The number of records converted at once.
+
+    Example
+    -------
+    >>> columns = Columns([("id", int), ("price", float), ("name", str)])
+    >>> columns.append(["1", "2.5", "foo"])
+    >>> columns.append(["2", "0.25", "bar"])
+    >>> columns.finish()
+    >>> len(columns), columns["id"], columns["price"], columns["name"]
+    (2, array('q', [1, 2]), array('d', [2.5, 0.25]), ['foo', 'bar'])
+    >>> columns = Columns([("id", int)])
+    >>> for k, field in enumerate(["1", "x", "3"]):
+    ...     columns.append([field], 2 * k)
+    >>> columns.finish()
+    >>> columns["id"], columns.position, columns.error
+    (array('q', [1]), 2, parse error at (2): invalid literal for int() with base 10: 'x')
+    """  # noqa: E501
+
+    def __init__(self, schema: Schema, numpy: bool = False,
+                 block: int = 1 << 12) -> None:
+        """Initialize method."""
+        for name, kind in schema:
+            assert kind is str or kind in TYPECODES, f"unsupported type {kind} of column {name}"  # noqa: E501
+        self.schema: List[Tuple[str, type]] = list(schema)
+        self.numpy: bool = numpy
+        self.block: int = block
+        self.columns: Dict[str, Any] = {
+            name: [] if kind is str or numpy else array(TYPECODES[kind])
+            for name, kind in self.schema}
+        self.rows: int = 0
+        self.position: int = 0
+        self.error: Optional[ParseResult] = None
+        self._pending: List[Sequence[str]] = []
+        self._starts: List[Optional[int]] = []
+
+    def append(self, fields: Sequence[str], position: Optional[int] = None) -> None:
+        """Add one record, starting at position of the text."""
+        if self.error is not None:
+            return
+        self._pending.append(fields)
+        self._starts.append(position)
+        if len(self._pending) >= self.block:
+            self._flush()
+
+    def finish(self) -> None:
+        """Convert the buffered records."""
+        self._flush()
+        if self.numpy:
+            import numpy as np  # type: ignore
+            for name, kind in self.schema:
+                if kind is not str:
+                    blocks = self.columns[name]
+                    self.columns[name] = (np.concatenate(blocks) if blocks
+                                          else np.empty(0, TYPECODES[kind]))
+
+    def _flush(self) -> None:
+        pending, starts = self._pending, self._starts
+        if not pending:
+            return
+        self._pending, self._starts = [], []
+        try:
+            converted = self._convert(pending)
+        except ValueError:
+            # slow path: find the first bad record and keep the ones before it.
+            bad, error = next((k, e) for k, e in enumerate(map(self._check, pending))
+                              if e is not None)
+            pending = pending[:bad]
+            converted = self._convert(pending)
+            start = starts[bad]
+            self.position = self.rows + bad if start is None else start
+            self.error = Failure(f"parse error at ({self.position}): {error}", self.position)  # noqa: E501
+        self.rows += len(pending)
+        for (name, kind), values in zip(self.schema, converted):
+            if kind is not str and self.numpy:
+                self.columns[name].append(values)
+            else:
+                self.columns[name].extend(values)
+
+    def _convert(self, records: Sequence[Sequence[str]]) -> List[Any]:
+        """Return the columns of records converted, or raise ValueError."""
+        converted: List[Any] = []
+        for (name, kind), values in zip(self.schema, zip(*records)):
+            if kind is str:
+                converted.append(values)
+            elif self.numpy:
+                import numpy as np  # type: ignore
+                converted.append(np.array(values).astype(TYPECODES[kind]))
+            else:
+                converted.append(array(TYPECODES[kind], map(kind, values)))
+        return converted
+
+    def _check(self, fields: Sequence[str]) -> Optional[ValueError]:
+        """Return the error converting one record, if any."""
+        try:
+            self._convert([fields])
+        except ValueError as e:
+            return e
+        return None
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return self.rows + len(self._pending)
+
+    def __getitem__(self, name: str) -> Any:
+        """Return the column name."""
+        return self.columns[name]
+
+    def __repr__(self) -> str:
+        """Return string."""
+        return f"Columns({len(self)} records, {', '.join(self.columns)})"
@@ -1,17 +1,23 @@
 """a parser function's combinator."""
+import copy
 import inspect
+import re
 from types import FrameType
 from typing import List, Callable, cast, Any
-from simpleparser.parseresult import ParseResult, Success, Failure
-from simpleparser.parser import Parser
+from simpleparser.parseresult import ParseResult, Success, Failure, Recovered, Chunk, join_chunks
+from simpleparser.parser import Parser, PrimitiveParser, interned
+from simpleparser.analysis import check_loop
 
 
+@interned
 def many(parser: Parser) -> Parser:
     """Many function.
 
     Receives one parser object.
     And repeats parsing for success.
     Must succeed at least once.
+    Stops when the parser succeeds without consuming input; building
+    it over such a parser warns with a NullableLoopWarning.
 
     Parameters
     ----------
@@ -36,10 +42,11 @@ def many(parser: Parser) -> Parser:
     >>> p.exec('foobar')
     ['foo']
     """
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
+    check_loop(name, parser)
 
     def f(target: str, position: int = 0) -> ParseResult:
-        result: List[str] = []
+        result: List[Chunk] = []
         pos: int = position
         first: bool = True
         children = []
@@ -50,18 +57,20 @@ def many(parser: Parser) -> Parser:
             if not parsed.success:
                 if first:
                     return Failure(parsed.message, position, children=children, name=name)
-                return Success(result, pos, children=children, name=name)
-            if parsed.position > len(target):
+                return Success(join_chunks(result), pos, children=children, name=name)
+            if parsed.chunk:
+                result.append(parsed.chunk)
+            if parsed.position == pos:
                 break
-            result.extend(parsed.tokens)
             first = False
             pos = parsed.position
 
-        return Success(result, pos, children=children, name=name)
+        return Success(join_chunks(result), pos, children=children, name=name)
 
-    return Parser(f)
+    return Parser(f, (parser,))
 
 
+@interned
 def choice(*args: Parser) -> Parser:
     """Choice function.
 
@@ -90,13 +99,13 @@ def choice(*args: Parser) -> Parser:
     parse error at (0): unexpected ali expecting foo (by token)
     parse error at (0): unexpected ali expecting bar (by token)
     """
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
     parsers = args
     assert len(args) >= 2
-    children = []
 
     def f(target: str, position: int = 0) -> ParseResult:
         messages = []
+        children = []
         for parser in parsers:
             parsed = parser.exec(target, position)
             children.append(parsed)
@@ -106,9 +115,10 @@ def choice(*args: Parser) -> Parser:
 
         return Failure("\n".join(messages), position, children=children, name=name)
 
-    return Parser(f)
+    return Parser(f, parsers)
 
 
+@interned
 def seq(*args: Parser) -> Parser:
     """Seq function.
 
@@ -139,27 +149,27 @@ def seq(*args: Parser) -> Parser:
     """
     assert len(args) >= 2
     parsers = args
-    children = []
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
 
     def f(target: str, position: int = 0) -> ParseResult:
-        result: List[str] = []
+        result: List[Chunk] = []
         pos_org = position
+        children = []
         for parser in parsers:
             parsed: ParseResult = parser.exec(target, position)
             children.append(parsed)
             if not parsed.success:
                 return Failure(parsed.message, pos_org, children=children, name=name)
-            if len(parsed.tokens) == 0:
-                continue
-            result.extend(parsed.tokens)
+            if parsed.chunk:
+                result.append(parsed.chunk)
             position = parsed.position
 
-        return Success(result, position, children=children, name=name)
+        return Success(join_chunks(result), position, children=children, name=name)
 
-    return Parser(f)
+    return Parser(f, parsers)
 
 
+@interned
 def option(parser: Parser) -> Parser:
     """Option function.
 
@@ -186,7 +196,7 @@ def option(parser: Parser) -> Parser:
     >>> p.exec('bar')  # not fail.
     []
     """
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
 
     def f(target: str, position: int = 0) -> ParseResult:
         result = parser.exec(target, position)
@@ -195,9 +205,10 @@ def option(parser: Parser) -> Parser:
             return result
         return Success([], position, children=children, name=name)
 
-    return Parser(f)
+    return Parser(f, (parser,))
 
 
+@interned
 def transform(parser: Parser, selector: Callable[[List[str]], Any]) -> Parser:  # noqa E501
     """Transform function.
 
@@ -227,12 +238,14 @@ def transform(parser: Parser, selector: Callable[[List[str]], Any]) -> Parser:
         result = parser.exec(target, position)
         if not result.success:
             return result
+        result = copy.copy(result)
         result.tokens = selector(result.tokens)
         return result
 
-    return Parser(f)
+    return Parser(f, (parser,), selector)
 
 
+@interned
 def end_by(parser: Parser, sep: Parser) -> Parser:
     """Endby p sep parses zero or more occurrences of p, separated and ended by sep.
 
@@ -249,16 +262,18 @@ def end_by(parser: Parser, sep: Parser) -> Parser:
     >>> p.exec('foo,foo,-')
     parse error at (0): unexpected foo,f expecting foo (by token)
     """  # noqa: D401, E501
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
+    check_loop(name, parser, sep)
 
     def f(target: str, position: int = 0) -> ParseResult:
-        tokens = []
+        tokens: List[Chunk] = []
         pos: int = position
         last_is_not_sep = False
         results = []
         children = []
 
         while pos < len(target):
+            start = pos
             parsed = parser.exec(target, pos)
             children.append(parsed)
             results.append(parsed)
@@ -269,7 +284,8 @@ def end_by(parser: Parser, sep: Parser) -> Parser:
                 return Failure(msg, pos, children=results, name=name)
                 # break
             last_is_not_sep = True
-            tokens.extend(parsed.tokens)
+            if parsed.chunk:
+                tokens.append(parsed.chunk)
             pos = parsed.position
             if pos == len(target):
                 break
@@ -286,6 +302,8 @@ def end_by(parser: Parser, sep: Parser) -> Parser:
                 # break
             last_is_not_sep = False
             pos = parsed.position
+            if pos == start:
+                break
 
         if last_is_not_sep:
             msg = (f"parse error at ({position}):"
@@ -293,11 +311,12 @@ def end_by(parser: Parser, sep: Parser) -> Parser:
                    f" expecting {parser.expression} (by {parser.parser_type})")
             return Failure(msg, pos, children=results, name=name)
 
-        return Success(tokens, pos, children=results, name=name)
+        return Success(join_chunks(tokens), pos, children=results, name=name)
 
-    return Parser(f)
+    return Parser(f, (parser, sep))
 
 
+@interned
 def sep_by(parser: Parser, sep: Parser) -> Parser:
     """Parse zero or more occurrences of parser, separated by sep.
 
@@ -310,30 +329,155 @@ def sep_by(parser: Parser, sep: Parser) -> Parser:
     >>> p.exec('foo,foo')
     ['foo', 'foo']
     """
-    name = inspect.getframeinfo(cast(FrameType, inspect.currentframe())).function
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
+    check_loop(name, parser, sep)
 
     def f(target: str, position: int = 0) -> ParseResult:
-        result = []
+        result: List[Chunk] = []
         pos = position
         children = []
 
         while True:
+            start = pos
             parsed = parser.exec(target, pos)
             children.append(parsed)
             if not parsed.success:
                 break
-            result.extend(parsed.tokens)
+            if parsed.chunk:
+                result.append(parsed.chunk)
             pos = parsed.position
 
             parsed = sep.exec(target, pos)
             children.append(parsed)
-            if not parsed.success:
+            if not parsed.success or parsed.position == start:
                 break
             pos = parsed.position
 
-        return Success(result, pos, children=children, name=name)
+        return Success(join_chunks(result), pos, children=children, name=name)
+
+    return Parser(f, (parser, sep))
+
+
+@interned
+def skip(parser: Parser) -> Parser:
+    """Skip function.
+
+    Receives one parser object.
+    Consumes what the parser consumes, but returns no tokens.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq, skip
+    >>> p = seq(skip(token("(")), token("foo"), skip(token(")")))
+    >>> p.exec("(foo)")
+    ['foo']
+    """
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
+
+    if isinstance(parser, PrimitiveParser):
+        # run the primitive in place: skip(token(...)) stays one primitive.
+        def f2(self: PrimitiveParser, target: str,
+               position: int = 0) -> ParseResult:
+            result = parser.run(target, position)
+            if not result.success:
+                return result
+            return Success([], result.position, name=name)
+
+        return PrimitiveParser(f2, parser.expression, parser.lookahead,
+                               parser.nullable, parser.overrun)
+
+    def f(target: str, position: int = 0) -> ParseResult:
+        result = parser.exec(target, position)
+        if not result.success:
+            return result
+        return Success([], result.position, children=[result], name=name)
+
+    return Parser(f, (parser,))
+
+
+def _searcher(sync: Parser) -> Callable[[str, int], int]:
+    """Return a function finding the end of the next match of sync, or -1."""
+    if sync.parser_type == "token":
+        literal = sync.expression
+
+        def find(target: str, position: int) -> int:
+            i = target.find(literal, position)
+            return i if i < 0 else i + len(literal)
+        return find
+
+    if sync.parser_type == "regex":
+        search = re.compile(sync.expression).search
+
+        def find_regex(target: str, position: int) -> int:
+            m = search(target, position)
+            return m.end() if m else -1
+        return find_regex
+
+    def find_any(target: str, position: int) -> int:
+        for i in range(position, len(target)):
+            parsed = sync.exec(target, i)
+            if parsed.success:
+                return parsed.position
+        return -1
+    return find_any
+
+
+@interned
+def recover(parser: Parser, sync: Parser) -> Parser:
+    r"""Recover function.
+
+    Parses zero or more occurrences of parser up to the end of input,
+    like many, but does not stop at a failure: the failure is recorded
+    and parsing continues after the next match of sync.
+    The result is a Recovered result holding the tokens of every
+    successful occurrence and the skipped failures in ``errors``.
+
+    A token or regex sync is found with str.find or re.search;
+    any other sync parser is tried at each position.
+
+    Parameters
+    ----------
+    parser
+        The parser of one record.
+    sync
+        The parser of the boundary to resynchronize at, e.g. newline().
+
+    Example
+    -------
+    >>> from simpleparser import regex, token, seq, recover
+    >>> line = seq(regex("[a-z]+"), token("="), regex("[0-9]+"), token("\n"))
+    >>> result = recover(line, token("\n")).exec("a=1\nb=xxxxx\nc=3\n")
+    >>> result
+    ['a', '=', '1', '\n', 'c', '=', '3', '\n']
+    >>> result.errors
+    [parse error at (6): unexpected xxxxx expecting [0-9]+ (by regex)]
+    """
+    name = cast(FrameType, inspect.currentframe()).f_code.co_name
+    find = _searcher(sync)
+
+    def f(target: str, position: int = 0) -> ParseResult:
+        tokens: List[Chunk] = []
+        errors: List[Failure] = []
+        children = []
+        pos = position
+        while pos < len(target):
+            parsed = parser.exec(target, pos)
+            children.append(parsed)
+            if parsed.success and parsed.position > pos:
+                if parsed.chunk:
+                    tokens.append(parsed.chunk)
+                pos = parsed.position
+                continue
+            if parsed.success:
+                parsed = Failure(f"parse error at ({pos}): no progress"
+                                 f" (by {name})", pos, children=[parsed], name=name)  # noqa: E501
+            errors.append(cast(Failure, parsed))
+            end = find(target, pos)
+            pos = len(target) if end < 0 else max(end, pos + 1)
+
+        return Recovered(join_chunks(tokens), pos, errors, children=children, name=name)  # noqa: E501
 
-    return Parser(f)
+    return Parser(f, (parser, sync))
 
 
 def lazy(callback: Callable[[], Parser]) -> Parser:
@@ -352,4 +496,4 @@ def lazy(callback: Callable[[], Parser]) -> Parser:
         parse = callback()
         return parse.exec(target, position)
 
-    return Parser(f)
+    return Parser(f, lambda: (callback(),))
@@ -0,0 +1,162 @@
+"""a parse context module."""
+
+import sys
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
+from simpleparser.parseresult import ParseResult, BudgetExceeded
+from simpleparser.lines import LineIndex
+
+if TYPE_CHECKING:  # pragma: no cover
+    from simpleparser.parser import Parser
+    from simpleparser.structural import StructuralIndex
+
+
+# steps between two readings of the clock.
+CHECK_INTERVAL = 1024
+
+
+class _Exhausted(Exception):
+    """raised through the running parsers when the budget runs out."""
+
+    def __init__(self, reason: str, limit: Any) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.limit = limit
+
+
+class ParseContext:
+    """Parse context class.
+
+    Holds the state of one parse, shared by every parser executed while
+    the context is active.
+    Parsers consult the active context in ``Parser.exec``; without an
+    active context they run directly.
+
+    Parameters
+    ----------
+    memo
+        Memoize the result of every parser at every position (packrat).
+    max_steps
+        Abort after this many parser invocations.
+    max_memo
+        Abort when the memo would hold more than this many results.
+    timeout
+        Abort when the parse runs longer than this many seconds,
+        measured on the monotonic clock from the start of ``exec``.
+    structural
+        A StructuralIndex of the target; take_until and skip_until over
+        indexed characters jump to the next structural position with it.
+
+    A parse which exceeds a limit returns a ``BudgetExceeded`` failure
+    holding the furthest position reached; it is not backtracked by the
+    enclosing combinators.
+    The limits are checked with a counter, the clock only every
+    ``CHECK_INTERVAL`` steps.
+
+    Example
+    -------
+    >>> from simpleparser import token, choice, seq
+    >>> foo = token("foo")
+    >>> p = choice(seq(foo, token("bar")), seq(foo, token("baz")))
+    >>> ctx = ParseContext(memo=True)
+    >>> ctx.exec(p, "foobaz")
+    ['foo', 'baz']
+    >>> len(ctx.memo)
+    6
+    >>> ParseContext(max_steps=4).exec(p, "foobaz")
+    parse error at (3): steps budget of 4 exceeded
+    """
+
+    def __init__(self, memo: bool = False,
+                 max_steps: Optional[int] = None,
+                 max_memo: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 structural: Optional["StructuralIndex"] = None) -> None:
+        """Initialize method."""
+        self.target: str = ""
+        self.memo: Optional[Dict[Tuple["Parser", int], ParseResult]] = {} if memo else None
+        self.max_steps: Optional[int] = max_steps
+        self.max_memo: Optional[int] = max_memo
+        self.timeout: Optional[float] = timeout
+        self.structural: Optional["StructuralIndex"] = structural
+        self.steps: int = 0
+        self.furthest: int = 0
+        self.deadline: float = 0.0
+        self._check_at: int = sys.maxsize
+        self._lines: Optional[LineIndex] = None
+
+    def reset(self, s: str) -> None:
+        """Prepare the context for parsing s."""
+        if s is not self.target:
+            self.target = s
+            self._lines = None
+            if self.memo is not None:
+                self.memo.clear()
+
+    @property
+    def lines(self) -> LineIndex:
+        r"""Return the line index of the target, built on first use.
+
+        Example
+        -------
+        >>> from simpleparser import regex, sep_by, token
+        >>> ctx = ParseContext()
+        >>> result = ctx.exec(sep_by(regex("[a-z]+"), token("\n")), "ab\ncd\nef")
+        >>> ctx.lines.location(result.position)
+        (3, 3)
+        """
+        if self._lines is None:
+            self._lines = LineIndex(self.target)
+        return self._lines
+
+    def exec(self, parser: "Parser", s: str, i: int = 0) -> ParseResult:
+        """Execute the parser with this context active."""
+        self.reset(s)
+        self.steps, self.furthest = 0, i
+        if self.timeout is not None:
+            self.deadline = time.monotonic() + self.timeout
+        self._check_at = self._next_check()
+        token = current_context.set(self)
+        try:
+            return parser.exec(s, i)
+        except _Exhausted as e:
+            return BudgetExceeded(e.reason, self.furthest, e.limit)
+        finally:
+            current_context.reset(token)
+
+    def _next_check(self) -> int:
+        limit = sys.maxsize if self.max_steps is None else self.max_steps + 1
+        if self.timeout is not None:
+            limit = min(limit, self.steps + CHECK_INTERVAL)
+        return limit
+
+    def _check(self) -> None:
+        """Raise _Exhausted if a limit is reached, else plan the next check."""
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise _Exhausted("steps", self.max_steps)
+        if self.timeout is not None and time.monotonic() >= self.deadline:
+            raise _Exhausted("timeout", self.timeout)
+        self._check_at = self._next_check()
+
+    def apply(self, parser: "Parser", s: str, i: int) -> ParseResult:
+        """Run one parser at one position on behalf of Parser.exec."""
+        if i > self.furthest:
+            self.furthest = i
+        self.steps += 1
+        if self.steps >= self._check_at:
+            self._check()
+        if self.memo is None:
+            return parser.run(s, i)
+        key = (parser, i)
+        result = self.memo.get(key)
+        if result is None:
+            result = parser.run(s, i)
+            if self.max_memo is not None and len(self.memo) >= self.max_memo:
+                raise _Exhausted("memo", self.max_memo)
+            self.memo[key] = result
+        return result
+
+
+current_context: "ContextVar[Optional[ParseContext]]" = ContextVar(
+    "simpleparser_context", default=None)
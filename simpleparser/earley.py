@@ -0,0 +1,513 @@
+"""an Earley parser backend with a shared packed parse forest."""
+
+import gc
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+from simpleparser.analysis import children_of, walk
+from simpleparser.parser import Parser
+from simpleparser.parseresult import ParseResult, Success, Failure
+
+
+class _Helper:
+    """a nonterminal added to write a combinator as rules."""
+
+    def __init__(self, name: str) -> None:
+        self.parser_type = name
+        self.action: Optional[Callable[[List[Any]], List[Any]]] = None
+
+
+Symbol = Union[Parser, _Helper]
+Item = Tuple[int, int, int]                  # rule, dot, origin
+Node = Tuple[Symbol, int, int]               # symbol, start, end
+Link = Tuple[Optional[Item], Node]           # predecessor item, child node
+
+# combinators passing the result of their only child through.
+_TRANSPARENT = {"transform", "skip", "lazy", "map_to", "collect"}
+
+
+_gc_lock = threading.Lock()
+_gc_pauses = 0                               # parses running, in every thread
+_gc_enabled = False                          # the state saved by the first
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pause the cyclic garbage collector while a parse runs.
+
+    A chart allocates millions of small tuples and dicts, but no
+    reference cycles; collections triggered by the allocations alone
+    made parsing quadratic.
+    The collector is process-wide: the first of overlapping parses
+    (nested or in other threads) saves its state and the last one
+    restores it.
+    """
+    global _gc_pauses, _gc_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_enabled:
+                gc.enable()
+
+
+class Grammar:
+    """Context-free rules of a parser graph.
+
+    seq, choice, option, many, sep_by and end_by become rules;
+    transform, skip, map_to, collect and lazy become unit rules, whose
+    actions (see Parser) the trees apply to the tokens.
+    Every other parser, primitives included, is a terminal matched by
+    running it in place (scannerless), as is a lazy parser whose
+    callback fails.
+    Repetitions are written left-recursive, which Earley parses in
+    linear time.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq, option
+    >>> g = Grammar(seq(token("a"), option(token("b"))))
+    >>> [(lhs.parser_type, [s.parser_type for s in rhs]) for lhs, rhs in g.rules]
+    [('seq', ['token', 'option']), ('option', ['token']), ('option', [])]
+    """
+
+    def __init__(self, start: Parser) -> None:
+        """Initialize method."""
+        self.start: Parser = start
+        self.rules: List[Tuple[Symbol, Tuple[Symbol, ...]]] = []
+        self.by_lhs: Dict[Symbol, List[int]] = {}
+        self.terminals: Set[Symbol] = set()
+        for parser in walk(start):
+            self._add_parser(parser)
+
+    def is_terminal(self, symbol: Symbol) -> bool:
+        """Return whether symbol is matched by running it."""
+        return symbol in self.terminals
+
+    def _rule(self, lhs: Symbol, *rhs: Symbol) -> None:
+        self.by_lhs.setdefault(lhs, []).append(len(self.rules))
+        self.rules.append((lhs, rhs))
+
+    def _add_parser(self, p: Parser) -> None:
+        kind = p.parser_type
+        children = children_of(p)
+        if children is None:
+            self.terminals.add(p)
+        elif kind == "seq":
+            self._rule(p, *children)
+        elif kind == "choice":
+            for child in children:
+                self._rule(p, child)
+        elif kind == "option":
+            self._rule(p, children[0])
+            self._rule(p)
+        elif kind == "many":
+            self._rule(p, children[0])
+            self._rule(p, p, children[0])
+        elif kind == "sep_by":
+            item, sep = children
+            items = _Helper("sep_by items")
+            self._rule(p)
+            self._rule(p, items)
+            self._rule(p, items, sep)
+            self._rule(items, item)
+            self._rule(items, items, sep, item)
+        elif kind == "end_by":
+            item, sep = children
+            items = _Helper("end_by items")
+            self._rule(p)
+            self._rule(p, items)
+            self._rule(items, item, sep)
+            self._rule(items, items, item, sep)
+        elif kind in _TRANSPARENT and len(children) == 1:
+            self._rule(p, children[0])
+        else:
+            self.terminals.add(p)
+
+
+class Tree:
+    """One parse tree of a Forest.
+
+    The children of the helper nonterminals of sep_by and end_by, and
+    of the left recursion of repetitions, are spliced into their
+    parent, so a repetition has one child per element.
+    """
+
+    def __init__(self, parser: Symbol, start: int, end: int,
+                 children: List["Tree"],
+                 result: Optional[ParseResult] = None) -> None:
+        """Initialize method."""
+        self.parser: Symbol = parser
+        self.start: int = start
+        self.end: int = end
+        self.children: List[Tree] = children
+        self.result: Optional[ParseResult] = result
+
+    @property
+    def tokens(self) -> List[Any]:
+        """Return the tokens of the tree, as the backtracking engine would.
+
+        The tokens of the terminals are joined in order, bottom-up, and
+        the action of transform, map_to and collect is applied to the
+        tokens of its child. skip and the separators of sep_by and
+        end_by return no tokens.
+        """
+        values: List[List[Any]] = [[]]      # the tokens of the open trees
+        stack: List[Tuple[Tree, bool]] = [(self, False)]
+        while stack:
+            tree, closing = stack.pop()
+            if closing:
+                tokens = values.pop()
+                action = tree.parser.action
+                values[-1].extend(tokens if action is None else action(tokens))
+                continue
+            if tree.result is not None:
+                values[-1].extend(tree.result.tokens)
+                continue
+            kind = tree.parser.parser_type
+            if kind == "skip":
+                continue
+            children = tree.children
+            if kind in ("sep_by", "end_by"):
+                sep = tree.parser.children()[1]  # type: ignore
+                children = [c for c in children if c.parser is not sep]
+            values.append([])
+            stack.append((tree, True))
+            stack.extend((child, False) for child in reversed(children))
+        return values[0]
+
+    def __repr__(self) -> str:
+        """Return string."""
+        if self.result is not None:
+            return repr(self.result.tokens)
+        return f"{self.parser.parser_type}{self.children!r}"
+
+
+PackedNode = Tuple[Any, ...]                 # ("symbol", node) or ("item", item, end)
+
+
+class Forest:
+    """Shared packed parse forest of an Earley parse.
+
+    A symbol node is a (symbol, start, end) span whose packed
+    alternatives are the rules completed over the span; the chart items
+    are its binarized intermediate nodes, each packing the ways to reach
+    it (a predecessor item and a child node). Shared sub-spans are
+    stored once, in the chart.
+    Trees are enumerated lazily and iteratively from the root.
+    """
+
+    def __init__(self, grammar: Grammar, text: str,
+                 links: List[Dict[Item, Dict[Link, None]]],
+                 completed: List[Dict[Tuple[Symbol, int], List[Item]]],
+                 matches: Dict[Tuple[Symbol, int], ParseResult],
+                 furthest: int) -> None:
+        """Initialize method."""
+        self.grammar: Grammar = grammar
+        self.text: str = text
+        self.links = links
+        self.completed = completed
+        self.matches = matches
+        self.furthest: int = furthest
+        self.root: Node = (grammar.start, 0, len(text))
+
+    @property
+    def success(self) -> bool:
+        """Return whether the whole text was recognized."""
+        symbol, start, end = self.root
+        return (symbol, start) in self.completed[end]
+
+    def _alternatives(self, node: PackedNode) -> List[Tuple[PackedNode, ...]]:
+        """Return the packed alternatives of node, each a tuple of children."""
+        if node[0] == "symbol":
+            symbol, start, end = node[1]
+            if self.grammar.is_terminal(symbol):
+                return [()]
+            return [(("item", item, end),)
+                    for item in self.completed[end].get((symbol, start), ())]
+        _, item, end = node
+        if item[1] == 0:
+            return [()]
+        return [(("item", prev, child[1]), ("symbol", child))
+                for prev, child in self.links[end][item]]
+
+    def trees(self) -> Iterator[Tree]:
+        """Yield every parse tree, lazily; cyclic derivations are skipped.
+
+        Each tree is built by a depth-first walk choosing one packed
+        alternative per visited node; the next tree changes the last
+        choice which has another alternative, like an odometer.
+        """
+        if not self.success:
+            return
+        choices: List[List[int]] = []    # [alternative, count] per visited node
+        while True:
+            tree, failed = self._build(choices)
+            if tree is not None:
+                yield tree
+            else:
+                del choices[failed + 1:]
+            while choices and choices[-1][0] + 1 >= choices[-1][1]:
+                choices.pop()
+            if not choices:
+                return
+            choices[-1][0] += 1
+
+    def first(self) -> Optional[Tree]:
+        """Return the first tree, which prefers earlier choice alternatives."""
+        return next(self.trees(), None)
+
+    def _build(self, choices: List[List[int]]) -> Tuple[Optional[Tree], int]:
+        """Build the tree of choices, extending them with first alternatives.
+
+        Returns the tree, or None and the index of the last choice made
+        when the walk meets a node already on its path (a cycle).
+        """
+        root: PackedNode = ("symbol", self.root)
+        # frame: node, chosen children, results of the children done
+        stack: List[Tuple[PackedNode, Tuple[PackedNode, ...], List[Any]]] = []
+        path: Set[PackedNode] = set()
+        visit = 0
+        result: Any = None
+        pending: Optional[PackedNode] = root
+        while True:
+            if pending is not None:
+                node = pending
+                if node in path:
+                    return None, visit - 1
+                alternatives = self._alternatives(node)
+                if visit == len(choices):
+                    choices.append([0, len(alternatives)])
+                children = alternatives[choices[visit][0]]
+                visit += 1
+                path.add(node)
+                stack.append((node, children, []))
+                pending = None
+            node, children, done = stack[-1]
+            if len(done) < len(children):
+                pending = children[len(done)]
+                continue
+            stack.pop()
+            path.discard(node)
+            result = self._assemble(node, done)
+            if not stack:
+                return result, visit - 1
+            stack[-1][2].append(result)
+
+    def _assemble(self, node: PackedNode, done: List[Any]) -> Any:
+        if node[0] == "item":
+            return done[0] + [done[1]] if done else []
+        symbol, start, end = node[1]
+        if self.grammar.is_terminal(symbol):
+            return Tree(symbol, start, end, [], self.matches[(symbol, start)])
+        return Tree(symbol, start, end, _splice(symbol, done[0]))
+
+    def count(self) -> int:
+        """Return the number of trees, without enumerating them.
+
+        Raises ValueError when the forest has a cycle (a loop over
+        nullable parsers), which has infinitely many trees.
+
+        Example
+        -------
+        >>> from simpleparser import token, regex, choice, seq, lazy
+        >>> e = choice(seq(lazy(lambda: e), token("+"), lazy(lambda: e)), regex("[0-9]"))  # noqa: E501
+        >>> [EarleyParser(e).parse("+".join("1" * n)).count() for n in range(1, 7)]
+        [1, 1, 2, 5, 14, 42]
+        """
+        if not self.success:
+            return 0
+        counts: Dict[PackedNode, int] = {}
+        active: Set[PackedNode] = set()
+        stack: List[Tuple[PackedNode, bool]] = [(("symbol", self.root), False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in counts:
+                continue
+            alternatives = self._alternatives(node)
+            if expanded:
+                counts[node] = sum(_product(counts, children) for children in alternatives)  # noqa: E501
+                active.discard(node)
+                continue
+            active.add(node)
+            stack.append((node, True))
+            stack.extend((child, False) for child in _pending(alternatives, counts, active))  # noqa: E501
+        return counts[("symbol", self.root)]
+
+
+def _product(counts: Dict[PackedNode, int], children: Tuple[PackedNode, ...]) -> int:  # noqa: E501
+    product = 1
+    for child in children:
+        product *= counts[child]
+    return product
+
+
+def _pending(alternatives: List[Tuple[PackedNode, ...]], counts: Dict[PackedNode, int],  # noqa: E501
+             active: Set[PackedNode]) -> Iterator[PackedNode]:
+    """Yield the children of alternatives not counted yet.
+
+    Raises ValueError on a child being counted, an ancestor: a cycle.
+    """
+    for children in alternatives:
+        for child in children:
+            if child in active:
+                raise ValueError("the forest has a cycle and infinitely many trees")  # noqa: E501
+            if child not in counts:
+                yield child
+
+
+def _splice(symbol: Symbol, children: List[Tree]) -> List[Tree]:
+    spliced: List[Tree] = []
+    for child in children:
+        if isinstance(child.parser, _Helper) or (child.parser is symbol and symbol.parser_type == "many"):  # noqa: E501
+            if not spliced:
+                # the left recursion: take over the list instead of copying it.
+                spliced = child.children
+                continue
+            spliced.extend(child.children)
+        else:
+            spliced.append(child)
+    return spliced
+
+
+class EarleyParser:
+    """Earley parser class.
+
+    Parses with the same grammar graph as the backtracking engine, but
+    with Earley's algorithm: all the parses of an ambiguous grammar are
+    found in cubic time at worst and packed in one Forest, and ordered
+    choice never backtracks exponentially.
+    Unlike the backtracking engine, choice is not ordered and
+    repetitions are not greedy: every context-free parse of the whole
+    text counts. Repetitions parse in linear time; right recursion
+    through lazy is quadratic.
+
+    Example
+    -------
+    >>> from simpleparser import token, choice, seq, lazy
+    >>> a = token("a")
+    >>> s = choice(seq(a, lazy(lambda: s), token("b")), seq(a, lazy(lambda: s)), a)
+    >>> p = EarleyParser(s)
+    >>> p.exec("aaab")
+    ['a', 'a', 'a', 'b']
+    >>> p.parse("aaab").count()
+    2
+    >>> p.exec("ab")
+    parse error at (1): unexpected b (by earley)
+    """  # noqa: E501
+
+    def __init__(self, parser: Parser) -> None:
+        """Initialize method."""
+        self.grammar: Grammar = Grammar(parser)
+
+    def exec(self, s: str) -> ParseResult:
+        """Parse the whole of s and return the tokens of the first tree."""
+        with _gc_paused():
+            forest = self.parse(s)
+            tree = forest.first()
+        if tree is None:
+            position = forest.furthest
+            return Failure(f"parse error at ({position}):"
+                           f" unexpected {s[position:position + 5]} (by earley)",
+                           position, name="earley")
+        return Success(tree.tokens, len(s), name="earley")
+
+    def parse(self, s: str) -> Forest:
+        """Recognize s and return the parse forest of the whole text."""
+        with _gc_paused():
+            return self._parse(s)
+
+    def _parse(self, s: str) -> Forest:
+        chart = _Chart(self.grammar, s)
+        for r in self.grammar.by_lhs.get(self.grammar.start, ()):
+            chart.add(0, (r, 0, 0), None)
+        furthest = 0
+        for i in range(len(s) + 1):
+            if chart.orders[i]:
+                furthest = i
+            chart.close(i)
+        return Forest(self.grammar, s, chart.links, chart.completed,
+                      {key: result for key, result in chart.matches.items() if result.success},  # noqa: E501
+                      furthest)
+
+
+class _Chart:
+    """the Earley sets of one parse, an item list and its links per position."""
+
+    def __init__(self, grammar: Grammar, s: str) -> None:
+        self.s = s
+        self.rules = grammar.rules
+        self.by_lhs = grammar.by_lhs
+        self.terminals = grammar.terminals
+        n = len(s)
+        self.links: List[Dict[Item, Dict[Link, None]]] = [{} for _ in range(n + 1)]  # noqa: E501
+        self.orders: List[List[Item]] = [[] for _ in range(n + 1)]
+        self.waiting: List[Dict[Symbol, List[Item]]] = [{} for _ in range(n + 1)]  # noqa: E501
+        self.completed: List[Dict[Tuple[Symbol, int], List[Item]]] = [{} for _ in range(n + 1)]  # noqa: E501
+        self.matches: Dict[Tuple[Symbol, int], ParseResult] = {}
+
+    def add(self, j: int, item: Item, link: Optional[Link]) -> None:
+        """Add item to the set at j, reached by link."""
+        row = self.links[j]
+        item_links = row.get(item)
+        if item_links is None:
+            item_links = row[item] = {}
+            self.orders[j].append(item)
+        if link is not None:
+            item_links[link] = None
+
+    def close(self, i: int) -> None:
+        """Process the items of the set at i, including those they add."""
+        order = self.orders[i]
+        predicted: Set[Symbol] = set()
+        empty: Set[Symbol] = set()
+        done: Set[Tuple[Symbol, int]] = set()
+        k = 0
+        while k < len(order):
+            item = order[k]
+            k += 1
+            r, dot, origin = item
+            lhs, rhs = self.rules[r]
+            if dot == len(rhs):
+                self._complete(i, item, lhs, done, empty)
+                continue
+            symbol = rhs[dot]
+            self.waiting[i].setdefault(symbol, []).append(item)
+            if symbol in self.terminals:
+                self._scan(i, item, symbol)
+                continue
+            if symbol not in predicted:
+                predicted.add(symbol)
+                for r2 in self.by_lhs.get(symbol, ()):
+                    self.add(i, (r2, 0, i), None)
+            if symbol in empty:
+                self.add(i, (r, dot + 1, origin), (item, (symbol, i, i)))
+
+    def _complete(self, i: int, item: Item, lhs: Symbol,
+                  done: Set[Tuple[Symbol, int]], empty: Set[Symbol]) -> None:
+        origin = item[2]
+        self.completed[i].setdefault((lhs, origin), []).append(item)
+        if (lhs, origin) in done:
+            return
+        done.add((lhs, origin))
+        if origin == i:
+            empty.add(lhs)
+        node = (lhs, origin, i)
+        for w in list(self.waiting[origin].get(lhs, ())):
+            self.add(i, (w[0], w[1] + 1, w[2]), (w, node))
+
+    def _scan(self, i: int, item: Item, symbol: Symbol) -> None:
+        key = (symbol, i)
+        result = self.matches.get(key)
+        if result is None:
+            result = self.matches[key] = symbol.run(self.s, i)  # type: ignore
+        if result.success and result.position <= len(self.s):
+            end = result.position
+            r, dot, origin = item
+            self.add(end, (r, dot + 1, origin), (item, (symbol, i, end)))
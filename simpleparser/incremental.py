@@ -0,0 +1,363 @@
+"""an incremental parser for edited documents."""
+
+import copy
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+from simpleparser.context import ParseContext, current_context
+from simpleparser.parser import Parser, PrimitiveParser
+from simpleparser.parseresult import Chunk, ParseResult, Success, join_chunks
+
+
+_POSITION = re.compile(r"parse error at \((\d+)\)")
+
+# failure messages quote this many characters from their position.
+_QUOTED = 5
+
+# entries examining more characters are listed apart, so an edit only
+# scans this many positions before it for the others.
+_LONG = 64
+
+# the repetitions which IncrementalParser resumes at the top level.
+_LOOPS = ("many", "sep_by", "end_by")
+
+# the combinators which scan the input outside Parser.exec, up to its end.
+_SCANNERS = ("recover",)
+
+
+class _Entry:
+    """a memoized result with the range it examined."""
+
+    __slots__ = ("start", "result", "examined")
+
+    def __init__(self, start: int, result: ParseResult, examined: int) -> None:
+        self.start = start
+        self.result = result
+        self.examined = examined
+
+    def result_at(self, position: int) -> ParseResult:
+        """Return the result moved to position."""
+        delta = position - self.start
+        if delta:
+            result = copy.copy(self.result)
+            result.position += delta
+            if not result.success:
+                result.message = _POSITION.sub(
+                    lambda m: f"parse error at ({int(m.group(1)) + delta})",
+                    result.message)
+            self.start, self.result = position, result
+        return self.result
+
+
+def _reach(parser: Parser, s: str, i: int, result: ParseResult,
+           reach: int) -> int:
+    """Return the end of the range examined by parser at i, from reach of its children."""
+    if isinstance(parser, PrimitiveParser):
+        overrun = None
+        if result.success and parser.overrun is not None:
+            overrun = parser.overrun(s, result.position)
+        if overrun is not None:
+            reach = max(reach, result.position + overrun)
+        elif parser.lookahead is None:
+            reach = len(s) + 1
+        else:
+            reach = i + parser.lookahead
+            if result.success:
+                reach = max(reach, result.position + 1)
+    elif parser.parser_type in _SCANNERS:
+        reach = len(s) + 1
+    if not result.success:
+        for m in _POSITION.finditer(result.message):
+            reach = max(reach, int(m.group(1)) + _QUOTED)
+    return reach
+
+
+class IncrementalContext(ParseContext):
+    """Parse context which keeps its memo across edits.
+
+    Every memo entry records how many characters from its position the
+    parse examined, including the characters quoted by its failure
+    messages, so an edit only invalidates the entries whose examined
+    range overlaps the edited range.
+    The memo is a list indexed by position; an edit splices it, which
+    moves every later entry to its new position at once.
+    The entries examining more than a few characters are also listed
+    apart, so an edit scans them and a short window before it rather
+    than every position before it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize method."""
+        super().__init__()
+        self.rows: List[Optional[Dict[Parser, _Entry]]] = []
+        self.reach: int = 0
+        # [position, parser, entry] of the entries examining more than _LONG
+        self.long: List[List[Any]] = []
+        # the first position of an entry dropped by the last edit, per parser
+        self.damaged: Dict[Parser, int] = {}
+
+    def reset(self, s: str) -> None:
+        """Prepare the context for parsing s."""
+        super().reset(s)
+        if len(self.rows) != len(s) + 2:
+            self.rows = [None] * (len(s) + 2)
+            self.long = []
+        self.reach = 0
+
+    def apply(self, parser: Parser, s: str, i: int) -> ParseResult:
+        """Run one parser at one position on behalf of Parser.exec."""
+        rows = self.rows
+        row = rows[i] if i < len(rows) else None
+        if row is not None:
+            entry = row.get(parser)
+            if entry is not None:
+                self.reach = max(self.reach, i + entry.examined)
+                return entry.result_at(i)
+
+        outer = self.reach
+        self.reach = i + 1
+        result = parser.run(s, i)
+        reach = _reach(parser, s, i, result, self.reach)
+        self.reach = max(outer, reach)
+
+        if i < len(rows):
+            if row is None:
+                row = rows[i] = {}
+            entry = row[parser] = _Entry(i, result, reach - i)
+            if reach - i > _LONG:
+                self.long.append([i, parser, entry])
+        return result
+
+    def invalidate(self, offset: int, deleted: int, inserted: int) -> None:
+        """Drop the entries overlapping the edit and move the later ones."""
+        rows = self.rows
+        damaged: Dict[Parser, int] = {}
+        for position in range(max(0, offset - _LONG), offset):
+            row = rows[position]
+            if row:
+                for parser in [p for p, e in row.items()
+                               if position + e.examined > offset]:
+                    del row[parser]
+                    damaged.setdefault(parser, position)
+        kept = []
+        for record in self.long:
+            position, parser, entry = record
+            if position >= offset + deleted:
+                record[0] += inserted - deleted
+                kept.append(record)
+            elif position + entry.examined <= offset:
+                kept.append(record)
+            elif position < offset:
+                row = rows[position]
+                if row and row.get(parser) is entry:
+                    del row[parser]
+                damaged[parser] = min(damaged.get(parser, position), position)
+        self.long = kept
+        self.damaged = damaged
+        rows[offset:offset + deleted] = [None] * inserted
+
+
+class _Loop:
+    """the iterations of a top level repetition.
+
+    ``starts`` holds the position of every iteration and, last, of the
+    attempt which ended the repetition; ``tail`` the tokens of that
+    attempt and ``end`` the final position.
+    The starts before ``gap`` are positions, the others and ``end`` are
+    relative to the end of the text, so an edit only converts the
+    starts between the previous edit and itself.
+    """
+
+    __slots__ = ("starts", "chunks", "tail", "end", "gap")
+
+    def __init__(self, starts: List[int], chunks: List[Chunk], tail: List[Chunk],
+                 end: int, length: int) -> None:
+        self.starts = starts
+        self.chunks = chunks
+        self.tail = tail
+        self.end = end - length
+        self.gap = len(starts)
+
+    @classmethod
+    def of(cls, kind: str, result: ParseResult, start: int,
+           length: int) -> "_Loop":
+        """Return the iterations of result, a repetition parsed from start."""
+        children = result.children
+        size = 1 if kind == "many" else 2
+        starts, chunks = [], []
+        k = 0
+        while k + size <= len(children) \
+                and all(c.success for c in children[k:k + size]) \
+                and children[k + size - 1].position != start:
+            starts.append(start)
+            chunks.append(children[k].chunk)
+            start = children[k + size - 1].position
+            k += size
+        starts.append(start)
+        tail = [c.chunk for c in children[k:k + 1] if c.success]
+        return cls(starts, chunks, tail, result.position, length)
+
+    def move(self, offset: int, length: int) -> None:
+        """Move the gap to the first start at or after offset."""
+        starts, gap = self.starts, self.gap
+        if gap and starts[gap - 1] >= offset:
+            new = bisect_left(starts, offset, 0, gap)
+            for k in range(new, gap):
+                starts[k] -= length
+        else:
+            new = bisect_left(starts, offset - length, gap)
+            for k in range(gap, new):
+                starts[k] += length
+        self.gap = new
+
+    def result(self, length: int, name: str) -> ParseResult:
+        """Return the result of the repetition."""
+        return Success(join_chunks([c for c in self.chunks + self.tail if c]),
+                       self.end + length, name=name)
+
+
+class IncrementalParser:
+    """Incremental parser class.
+
+    Parses a document once and re-parses it after each edit, reusing
+    the memoized results outside the edited range.
+    When the grammar is a repetition (many, sep_by or end_by) which
+    parsed the document, the re-parse resumes at the iteration before
+    the edit and stops as soon as it reaches the start of an old
+    iteration after it, so an edit costs about the edited iterations.
+    Otherwise it runs the grammar from the start again, but every
+    unchanged part is answered from the memo instead of being parsed.
+
+    Results taken from the memo are shared with the previous parse;
+    their children still refer to the positions of the parse which
+    produced them. A resumed result has no children.
+
+    Example
+    -------
+    >>> from simpleparser import token, regex, sep_by
+    >>> p = IncrementalParser(sep_by(regex(r"\\d+"), token(",")), "1,22,333")
+    >>> p.result
+    ['1', '22', '333']
+    >>> p.edit(2, 2, "4444")
+    ['1', '4444', '333']
+    >>> p.text
+    '1,4444,333'
+    >>> p.edit(0, 0, "0,")
+    ['0', '1', '4444', '333']
+    """
+
+    def __init__(self, parser: Parser, text: str) -> None:
+        """Initialize method."""
+        self.parser: Parser = parser
+        self.text: str = text
+        self.context: IncrementalContext = IncrementalContext()
+        self._loop: Optional[_Loop] = None
+        self.result: ParseResult = self._parse()
+
+    def edit(self, offset: int, deleted: int, inserted: str) -> ParseResult:
+        """Replace deleted characters at offset with inserted and re-parse.
+
+        Parameters
+        ----------
+        offset
+            The position of the edit.
+        deleted
+            The number of characters removed at offset.
+        inserted
+            The text inserted at offset.
+
+        Returns
+        -------
+        ParseResult
+            The result of parsing the edited text.
+        """
+        assert 0 <= offset and offset + deleted <= len(self.text), \
+            f"edit ({offset}, {deleted}) out of range {len(self.text)}"
+        if self._loop is not None:
+            self._loop.move(offset, len(self.text))
+        self.text = self.text[:offset] + inserted + self.text[offset + deleted:]
+        self.context.invalidate(offset, deleted, len(inserted))
+        result = None
+        if self._loop is not None:
+            self.context.reset(self.text)
+            token = current_context.set(self.context)
+            try:
+                result = self._resume(self._loop, offset, deleted, len(inserted))
+            finally:
+                current_context.reset(token)
+        self.result = self._parse() if result is None else result
+        return self.result
+
+    def _parse(self) -> ParseResult:
+        """Parse the text from the start and record its iterations."""
+        result = self.context.exec(self.parser, self.text)
+        kind = self.parser.parser_type
+        self._loop = None
+        if kind in _LOOPS and result.success:
+            self._loop = _Loop.of(kind, result, 0, len(self.text))
+        return result
+
+    def _resume(self, loop: _Loop, offset: int, deleted: int,
+                inserted: int) -> Optional[ParseResult]:
+        """Re-parse the iterations around the edit, or return None."""
+        kind = self.parser.parser_type
+        s, length = self.text, len(self.text)
+        starts, gap = loop.starts, loop.gap
+        first = offset
+        for parser in self.parser.children():
+            first = min(first, self.context.damaged.get(parser, first))
+        a = max(bisect_right(starts, first, 0, gap) - 1, 0)
+        pos = starts[a] if a < gap else 0
+        new_starts: List[int] = []
+        new_chunks: List[Chunk] = []
+        while True:
+            if pos >= offset + inserted:
+                b = bisect_left(starts, pos - length, gap)
+                if b < len(starts) and starts[b] == pos - length:
+                    if kind == "many" and not (a or new_starts or b < len(starts) - 1):
+                        return None
+                    starts[a:b] = new_starts
+                    loop.chunks[a:b] = new_chunks
+                    loop.gap = a + len(new_starts)
+                    return loop.result(length, kind)
+            step = self._iteration(kind, s, pos)
+            if step is None:
+                break
+            new_starts.append(pos)
+            new_chunks.append(step[1])
+            pos = step[0]
+        # the repetition ends before the old iterations after the edit.
+        rest = self.parser.run(s, pos)
+        if rest.success:
+            last = _Loop.of(kind, rest, pos, length)
+        elif kind == "many" and (a or new_starts):
+            last = _Loop([pos], [], [], pos, length)
+        else:
+            return None
+        loop.starts = starts[:a] + new_starts + last.starts
+        loop.chunks = loop.chunks[:a] + new_chunks + last.chunks
+        loop.tail, loop.end, loop.gap = last.tail, last.end, len(loop.starts)
+        return loop.result(length, kind)
+
+    def _iteration(self, kind: str, s: str, pos: int) -> Optional[Tuple[int, Chunk]]:
+        """Run one iteration of the repetition from pos.
+
+        Return its end and tokens, or None where the repetition ends.
+        """
+        children = self.parser.children()
+        if kind == "end_by" and pos >= len(s):
+            return None
+        parsed = children[0].exec(s, pos)
+        if not parsed.success:
+            return None
+        end = parsed.position
+        if kind != "many":
+            if kind == "end_by" and end == len(s):
+                return None
+            separated = children[1].exec(s, end)
+            if not separated.success:
+                return None
+            end = separated.position
+        if end == pos:
+            return None
+        return end, parsed.chunk
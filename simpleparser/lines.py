@@ -0,0 +1,76 @@
+"""a line index module."""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+_LF = re.compile(r"\n")
+
+
+class LineIndex:
+    r"""Line index class.
+
+    Holds the offset where every line of a text starts, found in one
+    regex pass, and converts offsets to lines and columns by bisection.
+    CRLF, CR and LF are line breaks. Lines and columns start at 1.
+
+    Example
+    -------
+    >>> index = LineIndex("ab\ncd\r\nef")
+    >>> len(index), index.location(0), index.location(4), index.location(7)
+    (3, (1, 1), (2, 2), (3, 1))
+    >>> index.lines(2, 3)
+    'cd\r\nef'
+    """
+
+    def __init__(self, text: str) -> None:
+        """Initialize method."""
+        self.text: str = text
+        self.starts: "array[int]" = array("q", [0])
+        # a plain LF pattern runs about 3 times faster than the alternation.
+        breaks = _LINE_BREAK if "\r" in text else _LF
+        self.starts.extend(map(re.Match.end, breaks.finditer(text)))
+
+    def __len__(self) -> int:
+        """Return the number of lines."""
+        return len(self.starts)
+
+    def line(self, offset: int) -> int:
+        """Return the line of offset."""
+        return bisect_right(self.starts, offset)
+
+    def location(self, offset: int) -> Tuple[int, int]:
+        """Return the line and the column of offset."""
+        line = bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+    def span(self, first: int, last: int) -> Tuple[int, int]:
+        """Return the start and end offsets of the lines first to last."""
+        first = max(first, 1)
+        end = self.starts[last] if last < len(self.starts) else len(self.text)
+        return self.starts[first - 1], end
+
+    def lines(self, first: int, last: int) -> str:
+        """Return the text of the lines first to last, with line breaks."""
+        start, end = self.span(first, last)
+        return self.text[start:end]
+
+    def describe(self, offset: int, before: int = 0, after: int = 0) -> str:
+        r"""Return the location of offset and its lines, marked with a caret.
+
+        Example
+        -------
+        >>> print(LineIndex("a,b\nc,,d\ne").describe(6, before=1))
+        line 2, column 3
+        a,b
+        c,,d
+          ^
+        """
+        line, column = self.location(offset)
+        text = self.lines(line - before, line).rstrip("\r\n")
+        following = self.lines(line + 1, line + after).rstrip("\r\n") if after else ""
+        marked = f"line {line}, column {column}\n{text}\n{' ' * (column - 1)}^"
+        return marked + ("\n" + following if following else "")
@@ -1,24 +1,364 @@
 """a parser module."""
 
-from typing import Callable, TypeVar
-from inspect import stack
-from simpleparser.parseresult import ParseResult
+import functools
+import sys
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union, cast
+from weakref import WeakValueDictionary
+from simpleparser.parseresult import ParseResult, BatchResult, BudgetExceeded, Success, Failure
+from simpleparser.context import ParseContext, current_context
+from simpleparser.columnar import Columns, Schema
+
+
+def _caller_name() -> str:
+    """Return the name of the function constructing the parser."""
+    frame = sys._getframe(1)
+    while frame.f_code.co_name == "__init__" and frame.f_back is not None:
+        frame = frame.f_back
+    return frame.f_code.co_name
+
+
+Children = Union[Sequence["Parser"], Callable[[], Sequence["Parser"]]]
+
+
+F = TypeVar("F", bound=Callable[..., "Parser"])
+
+_interned: "WeakValueDictionary[Tuple[Any, ...], Parser]" = WeakValueDictionary()
+_interned_lock = threading.Lock()
+
+
+def interned(factory: F) -> F:
+    """Make factory return one shared parser per arguments (hash-consing).
+
+    Parsers are immutable, so every call of factory with equal
+    arguments may return the same canonical node: memo tables,
+    profilers and grammar analyses then see one node instead of many.
+    Parser and callable arguments are compared by identity, so sharing
+    builds up from the primitives. They are keyed by id(), which cannot
+    be reused while the shared parser, holding them, lives; so the
+    table never keeps a parser alive, recursive grammars included, and
+    a parser lives as long as it is used.
+    Calls with unhashable arguments are not interned.
+
+    Example
+    -------
+    >>> from simpleparser import token, seq
+    >>> token(",") is token(","), seq(token("a"), token(",")) is seq(token("a"), token(","))
+    (True, True)
+    """  # noqa: E501
+    @functools.wraps(factory)
+    def wrapper(*args: Any, **kwargs: Any) -> Parser:
+        key = (factory, tuple(map(_key, args)),
+               tuple(sorted((name, _key(value)) for name, value in kwargs.items())))
+        try:
+            with _interned_lock:
+                parser = _interned.get(key)
+        except TypeError:
+            return factory(*args, **kwargs)
+        if parser is None:
+            parser = factory(*args, **kwargs)
+            with _interned_lock:
+                parser = _interned.setdefault(key, parser)
+        return parser
+
+    return cast(F, wrapper)
+
+
+def _key(argument: Any) -> Any:
+    """Return argument as part of an interning key, parsers and functions by id."""  # noqa: E501
+    if isinstance(argument, Parser) or callable(argument):
+        return ("id", id(argument))
+    return argument
 
 
 class Parser:
-    """a parser class."""
+    """a parser class.
 
-    def __init__(self, f: Callable[[str, int], ParseResult]):
-        """Initialize method."""
+    Parser objects are immutable after construction, and all the state
+    of a parse lives in its ParseContext and local variables,
+    so one parser can be used from many threads at once.
+    """
+
+    def __init__(self, f: Callable[[str, int], ParseResult],
+                 parsers: Children = (),
+                 action: Optional[Callable[[List[Any]], List[Any]]] = None):
+        """Initialize method.
+
+        parsers are the sub-parsers f runs, or a function returning
+        them when they are not defined yet (lazy).
+        action is the function of the tokens of the only sub-parser
+        that f returns as its tokens (transform, map_to, collect), for
+        backends which do not run f, like EarleyParser.
+        """
         self.__f = f
-        self.parser_type = [x for x in stack() if x.function !=
-                            "__init__"][0].function
+        self.__parsers = parsers
+        self.action = action
+        self.parser_type = _caller_name()
         self.expression = ""
+        self._frozen = True
+
+    def children(self) -> Tuple["Parser", ...]:
+        """Return the sub-parsers of this parser, in order."""
+        parsers = self.__parsers
+        return tuple(parsers() if callable(parsers) else parsers)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Refuse to change the parser after construction."""
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} object is immutable")
+        super().__setattr__(name, value)
 
     def exec(self, s: str, i: int = 0) -> ParseResult:
-        """Return the executable function object."""
+        """Return the executable function object.
+
+        Runs through the active ParseContext, if there is one.
+        """
+        context = current_context.get()
+        if context is None:
+            return self.run(s, i)
+        return context.apply(self, s, i)
+
+    def run(self, s: str, i: int = 0) -> ParseResult:
+        """Run the parser function without consulting the ParseContext."""
         return self.__f(s, i)
 
+    def exec_many(self, inputs: Iterable[str],
+                  executor: Optional[Executor] = None,
+                  context: Optional[Callable[[], ParseContext]] = None
+                  ) -> List[ParseResult]:
+        r"""Parse every input concurrently with this parser.
+
+        Parameters
+        ----------
+        inputs
+            The strings to parse.
+        executor
+            The executor running the parses, typically a ThreadPoolExecutor
+            shared by the caller. A temporary ThreadPoolExecutor is used
+            when omitted.
+        context
+            A factory of the ParseContext used for each input,
+            e.g. ``lambda: ParseContext(memo=True)``.
+
+        Returns
+        -------
+        List[ParseResult]
+            The results in the order of inputs.
+
+        Example
+        -------
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from simpleparser import regex
+        >>> num = regex(r"\d+")
+        >>> with ThreadPoolExecutor(max_workers=4) as pool:
+        ...     num.exec_many(["1", "22", "x"], executor=pool)
+        [['1'], ['22'], parse error at (0): unexpected x expecting \d+ (by regex)]
+        """  # noqa: E501
+        def parse(s: str) -> ParseResult:
+            if context is None:
+                return self.exec(s)
+            return context().exec(self, s)
+
+        if executor is None:
+            with ThreadPoolExecutor() as pool:
+                return list(pool.map(parse, inputs))
+        return list(executor.map(parse, inputs))
+
+    def exec_batch(self, inputs: Iterable[str], tokens: bool = True,
+                   fuse: bool = False,
+                   context: Optional[ParseContext] = None) -> BatchResult:
+        r"""Parse many small inputs in one call.
+
+        The results are appended to the columns of one BatchResult
+        instead of being returned as ParseResult objects.
+        Without a context, every input is parsed with exec and no
+        ParseContext is used.
+
+        Parameters
+        ----------
+        inputs
+            The strings to parse.
+        tokens
+            Keep the tokens of every input. Only status, end positions
+            and spans are kept otherwise.
+        fuse
+            Join the inputs into one buffer and parse each input at its
+            offset. The parser must stop at the end of each input by
+            itself, since it can see the following inputs; a parse which
+            runs past the end of its input is reported as a failure.
+        context
+            The ParseContext each input is parsed with, through its own
+            ``context.exec``, which resets the counters of the budget
+            per input. An input exceeding the budget fails and its
+            BudgetExceeded result is kept in ``exceeded``.
+
+        Example
+        -------
+        >>> from simpleparser import regex
+        >>> num = regex(r"\d+")
+        >>> batch = num.exec_batch(["12", "345", "x"])
+        >>> list(batch.success), list(batch.positions), batch.tokens
+        ([1, 1, 0], [2, 3, 0], [['12'], ['345'], []])
+        >>> batch[2]
+        parse error at (0): unexpected x expecting \d+ (by regex)
+        >>> batch = regex(r"\d+;").exec_batch(["12;", "345;"], tokens=False, fuse=True)
+        >>> list(batch.success), batch.spans(), batch.buffer
+        ([1, 1], [(0, 3), (3, 7)], '12;345;')
+        >>> batch = num.exec_batch(["12", "345"], fuse=True)
+        >>> list(batch.success), batch[0]
+        ([0, 1], parse error at (2): parse runs past the end of input 0)
+        """
+        batch = BatchResult(tokens)
+        add_success = batch.success.append
+        add_position = batch.positions.append
+        add_offset = batch.offsets.append
+        add_tokens = batch.tokens.append if batch.tokens is not None else None
+        errors = batch.errors
+
+        for index, (result, start) in enumerate(
+                self._exec_records(inputs, batch, fuse, context)):
+            add_success(result.success)
+            add_position(result.position - start)
+            add_offset(start)
+            if add_tokens is not None:
+                add_tokens(result.tokens)
+            if not result.success:
+                errors[index] = result.message
+                if isinstance(result, BudgetExceeded):
+                    batch.exceeded[index] = result
+        return batch
+
+    def _exec_records(self, inputs: Iterable[str], batch: BatchResult,
+                      fuse: bool, context: Optional[ParseContext]
+                      ) -> Iterator[Tuple[ParseResult, int]]:
+        """Yield the result and the start offset of every input."""
+        run = self.exec if context is None else functools.partial(context.exec, self)
+        if not fuse:
+            for s in inputs:
+                yield run(s, 0), 0
+            return
+
+        records = list(inputs)
+        batch.buffer = "".join(records)
+        start = 0
+        for index, s in enumerate(records):
+            end = start + len(s)
+            result = run(batch.buffer, start)
+            if result.success and result.position > end:
+                result = Failure(f"parse error at ({end}): parse runs past the end of input {index}", end)  # noqa: E501
+            yield result, start
+            start = end
+
+    def exec_columns(self, s: str, schema: Schema, numpy: bool = False,
+                     context: Optional[ParseContext] = None) -> Columns:
+        r"""Parse the records of s into typed columns.
+
+        This parser parses one record; it runs repeatedly from the
+        start of s to its end, and the fields of every record go
+        straight into the columns (see Columns) instead of a list of
+        rows. The fields are the tokens of the record, or its only token
+        when that is a list, like csv_record.
+        Parsing stops at the first failing record, kept in ``error``,
+        or at the first record with a field which does not convert.
+
+        Parameters
+        ----------
+        s
+            The text to parse.
+        schema
+            The (name, type) of every field; the type is int, float or str.
+        numpy
+            Return NumPy arrays for the int and float columns.
+        context
+            The ParseContext used for the whole parse. Its budget
+            applies to each record; a record exceeding it stops the
+            parse with its BudgetExceeded result in ``error``.
+
+        Example
+        -------
+        >>> from simpleparser.builtin_parsers import csv_record
+        >>> columns = csv_record().exec_columns("1,2.5\n2,3\n", [("a", int), ("b", float)])
+        >>> columns["a"], columns["b"], columns.position
+        (array('q', [1, 2]), array('d', [2.5, 3.0]), 10)
+        >>> csv_record().exec_columns("1,2\n3\n", [("a", int), ("b", int)]).error
+        parse error at (4): expecting 2 fields, got 1
+        """  # noqa: E501
+        columns = Columns(schema, numpy=numpy)
+        width = len(columns.schema)
+        append = columns.append
+        run = self.exec if context is None else functools.partial(context.exec, self)
+        pos = 0
+        while pos < len(s) and columns.error is None:
+            result = run(s, pos)
+            if not result.success or result.position <= pos:
+                columns.error = result
+                break
+            fields = result.tokens
+            if len(fields) == 1 and isinstance(fields[0], list):
+                fields = fields[0]
+            if len(fields) != width:
+                columns.error = Failure(f"parse error at ({pos}): expecting {width} fields, got {len(fields)}", pos)  # noqa: E501
+                break
+            start, pos = pos, result.position
+            # set first: a field which does not convert moves it back to its record.
+            columns.position = pos
+            append(fields, start)
+        columns.finish()
+        return columns
+
+    def map_to(self, f: Callable[..., Any]) -> "Parser":
+        """Map method.
+
+        Replaces the tokens of a successful parse with the single value
+        ``f(*tokens)``, so values are built bottom-up during the parse.
+
+        Example
+        -------
+        >>> from simpleparser import regex, token, seq, skip
+        >>> num = regex(r"[0-9]+").map_to(int)
+        >>> num.exec("42")
+        [42]
+        >>> pair = seq(num, skip(token(":")), num).map_to(lambda k, v: (k, v))
+        >>> pair.exec("1:2")
+        [(1, 2)]
+        """
+        name = "map_to"
+
+        def f2(target: str, position: int = 0) -> ParseResult:
+            result = self.exec(target, position)
+            if not result.success:
+                return result
+            return Success([f(*result.tokens)], result.position,
+                           children=[result], name=name)
+
+        return Parser(f2, (self,), lambda tokens: [f(*tokens)])
+
+    def collect(self, factory: Callable[[List[Any]], Any]) -> "Parser":
+        """Collect method.
+
+        Replaces the tokens of a successful parse with the single value
+        ``factory(tokens)``, e.g. ``collect(dict)`` for a list of pairs.
+
+        Example
+        -------
+        >>> from simpleparser import regex, token, seq, sep_by, skip
+        >>> num = regex(r"[0-9]+").map_to(int)
+        >>> pair = seq(num, skip(token(":")), num).map_to(lambda k, v: (k, v))
+        >>> sep_by(pair, token(",")).collect(dict).exec("1:2,3:4")
+        [{1: 2, 3: 4}]
+        """
+        name = "collect"
+
+        def f2(target: str, position: int = 0) -> ParseResult:
+            result = self.exec(target, position)
+            if not result.success:
+                return result
+            return Success([factory(result.tokens)], result.position,
+                           children=[result], name=name)
+
+        return Parser(f2, (self,), lambda tokens: [factory(tokens)])
+
     # def __add__(self, other):
     #     r"""Add method.
 
@@ -75,19 +415,39 @@ T = TypeVar('T', bound='PrimitiveParser')
 
 
 class PrimitiveParser(Parser):
-    """a parser class."""
+    """a parser class.
+
+    lookahead is how many characters from the start position a failing
+    parse may have examined, or None if it is unknown.
+    nullable tells whether the parser may succeed without consuming
+    input.
+    overrun, if given, returns for the target and the end position of
+    a successful parse how many characters from the end it may have
+    examined, or None if it cannot tell; lookahead tells it otherwise.
+    """
 
     def __init__(
             self,
             f: Callable[[T, str, int], ParseResult],
-            expression: str):
+            expression: str,
+            lookahead: Optional[int] = None,
+            nullable: bool = False,
+            overrun: Optional[Callable[[str, int], Optional[int]]] = None):
         """Initialize method."""
         # super().__init__(f)
         self.__f2 = f
-        self.parser_type = [x for x in stack() if x.function !=
-                            "__init__"][0].function
+        self.parser_type = _caller_name()
         self.expression = expression
+        self.lookahead = lookahead
+        self.nullable = nullable
+        self.overrun = overrun
+        self.action = None
+        self._frozen = True
+
+    def children(self) -> Tuple["Parser", ...]:
+        """Return the sub-parsers of this parser, in order."""
+        return ()
 
-    def exec(self: T, s: str, i: int = 0) -> ParseResult:
-        """Return the executable function object."""
+    def run(self: T, s: str, i: int = 0) -> ParseResult:
+        """Run the parser function without consulting the ParseContext."""
         return self.__f2(self, s, i)
@@ -1,28 +1,110 @@
 """a simple parser combinator."""
 
-from typing import List, Callable, TypeVar
+from array import array
+from typing import Any, Dict, Iterator, List, Callable, Optional, Tuple, TypeVar, Union
 
 
 T = TypeVar('T', bound='ParseResult')
 
 
+class TokenRope:
+    """Token rope class.
+
+    An append-only token buffer made of chunks (token lists or other
+    ropes) shared by reference, so combinators concatenate the tokens
+    of their children without copying them.
+    The chunks must not be modified after they are added.
+
+    Example
+    -------
+    >>> inner = TokenRope([["b"], ["c", "d"]])
+    >>> rope = TokenRope([["a"], inner, ["e"]])
+    >>> len(rope)
+    5
+    >>> rope.flatten()
+    ['a', 'b', 'c', 'd', 'e']
+    """
+
+    __slots__ = ("parts", "length")
+
+    def __init__(self, parts: List["Chunk"]) -> None:
+        """Initialize method."""
+        self.parts: List[Chunk] = parts
+        self.length: int = sum(len(part) for part in parts)
+
+    def __len__(self) -> int:
+        """Return the number of tokens."""
+        return self.length
+
+    def flatten(self) -> List[Any]:
+        """Return all tokens as a new list."""
+        tokens: List[Any] = []
+        stack = [iter(self.parts)]
+        while stack:
+            for part in stack[-1]:
+                if isinstance(part, TokenRope):
+                    stack.append(iter(part.parts))
+                    break
+                tokens.extend(part)
+            else:
+                stack.pop()
+        return tokens
+
+
+Chunk = Union[List[Any], TokenRope]
+
+
+def join_chunks(parts: List[Chunk]) -> Chunk:
+    """Return the concatenation of non-empty chunks without copying tokens.
+
+    Example
+    -------
+    >>> a = ["a"]
+    >>> join_chunks([]), join_chunks([a]) is a
+    ([], True)
+    >>> join_chunks([a, ["b"]]).flatten()
+    ['a', 'b']
+    """
+    if not parts:
+        return []
+    if len(parts) == 1:
+        return parts[0]
+    return TokenRope(parts)
+
+
 class ParseResult:
-    """Parsed Result class."""
+    """Parsed Result class.
+
+    The tokens may be held as a TokenRope (see ``chunk``); they are
+    flattened into a list once, when ``tokens`` is first read.
+    """
 
     def __init__(self,
                  success: bool,
-                 tokens: List[str],
+                 tokens: Chunk,
                  position: int,
                  message: str = "",
-                 children: List[T] = None,
+                 children: Optional[List["ParseResult"]] = None,
                  name: str = "") -> None:
         """Initialize method."""
         self.success: bool = success
-        self.tokens: List[str] = tokens
+        self.chunk: Chunk = tokens
         self.position: int = position
         self.message: str = message
         self.name: str = name
-        self.children: List[T] = children if children is not None else []
+        self.children: List[ParseResult] = children if children is not None else []
+
+    @property
+    def tokens(self) -> List[Any]:
+        """Return the tokens as a list."""
+        chunk = self.chunk
+        if isinstance(chunk, TokenRope):
+            chunk = self.chunk = chunk.flatten()
+        return chunk
+
+    @tokens.setter
+    def tokens(self, tokens: List[Any]) -> None:
+        self.chunk = tokens
 
     def then(self: T, f: Callable[[T], None]) -> T:
         """Execute function then parse is success."""
@@ -40,11 +122,17 @@ class ParseResult:
 class Success(ParseResult):
     """Parsed Success class."""
 
-    def __init__(self, tokens: List[str], position: int,
-                 children: List[T] = None,
+    def __init__(self, tokens: Chunk, position: int,
+                 children: Optional[List[ParseResult]] = None,
                  name: str = "") -> None:
         """Initialize method."""
-        super().__init__(True, tokens, position, "", children=children, name=name)
+        # assigned in place: results are allocated on every parser call.
+        self.success = True
+        self.chunk = tokens
+        self.position = position
+        self.message = ""
+        self.name = name
+        self.children = children if children is not None else []
 
     def __repr__(self) -> str:
         """Return string."""
@@ -55,11 +143,93 @@ class Failure(ParseResult):
     """Parsed Failure class."""
 
     def __init__(self, message: str, position: int,
-                 children: List[T] = None,
+                 children: Optional[List[ParseResult]] = None,
                  name: str = "") -> None:
         """Initialize method."""
-        super().__init__(False, [], position, message, children=children, name=name)
+        self.success = False
+        self.chunk = []
+        self.position = position
+        self.message = message
+        self.name = name
+        self.children = children if children is not None else []
 
     def __repr__(self) -> str:
         """Return string."""
         return self.message
+
+
+class Recovered(Success):
+    """Parsed Success class of recover.
+
+    errors are the failures skipped over, in input order.
+    """
+
+    def __init__(self, tokens: Chunk, position: int,
+                 errors: List[Failure],
+                 children: Optional[List[ParseResult]] = None,
+                 name: str = "") -> None:
+        """Initialize method."""
+        super().__init__(tokens, position, children=children, name=name)
+        self.errors: List[Failure] = errors
+
+
+class BudgetExceeded(Failure):
+    """Parse aborted by the budget of its ParseContext.
+
+    ``reason`` names the exhausted limit ("steps", "memo" or "timeout")
+    and ``position`` is the furthest position the parse reached.
+    """
+
+    def __init__(self, reason: str, position: int, limit: Any) -> None:
+        """Initialize method."""
+        super().__init__(f"parse error at ({position}): {reason} budget of {limit} exceeded",
+                         position, name="budget")
+        self.reason: str = reason
+
+
+class BatchResult:
+    """Columnar results of Parser.exec_batch.
+
+    success[i] and positions[i] are the status and the end position of
+    the i-th input, relative to the start of that input.
+    tokens[i] are its tokens (kept only when requested), offsets[i] its
+    start in the fused buffer, and errors maps failed indexes to their
+    messages. exceeded maps the indexes of the inputs which exceeded
+    the budget of the context to their BudgetExceeded results.
+    """
+
+    def __init__(self, keep_tokens: bool = True) -> None:
+        """Initialize method."""
+        self.success: "array[int]" = array("b")
+        self.positions: "array[int]" = array("q")
+        self.offsets: "array[int]" = array("q")
+        self.tokens: Optional[List[Any]] = [] if keep_tokens else None
+        self.errors: Dict[int, str] = {}
+        self.exceeded: Dict[int, BudgetExceeded] = {}
+        self.buffer: str = ""
+
+    def __len__(self) -> int:
+        """Return the number of inputs."""
+        return len(self.success)
+
+    def __getitem__(self, i: int) -> ParseResult:
+        """Return the i-th result as a ParseResult."""
+        if self.success[i]:
+            tokens = self.tokens[i] if self.tokens is not None else []
+            return Success(tokens, self.positions[i])
+        if i in self.exceeded:
+            return self.exceeded[i]
+        return Failure(self.errors[i], self.positions[i])
+
+    def __iter__(self) -> Iterator[ParseResult]:
+        """Return the results as ParseResult objects, in order."""
+        return (self[i] for i in range(len(self)))
+
+    def spans(self) -> List[Tuple[int, int]]:
+        """Return (start, end) of the consumed text of every input in the fused buffer."""  # noqa: E501
+        return [(start, start + end)
+                for start, end in zip(self.offsets, self.positions)]
+
+    def __repr__(self) -> str:
+        """Return string."""
+        return f"BatchResult({len(self)} inputs, {len(self.errors)} errors)"
@@ -1,10 +1,18 @@
 """a simple parser combinator."""
 
 import re
+from typing import Callable, Iterator, Optional
 from simpleparser.parseresult import ParseResult, Success, Failure
-from simpleparser.parser import Parser, PrimitiveParser
+from simpleparser.parser import Parser, PrimitiveParser, interned
+from simpleparser.context import current_context
 
+try:
+    from re import _parser as sre_parse  # type: ignore
+except ImportError:  # pragma: no cover
+    import sre_parse  # type: ignore
 
+
+@interned
 def token(s: str) -> Parser:
     """Token function.
 
@@ -35,19 +43,27 @@ def token(s: str) -> Parser:
                f" expecting {s} (by {self.parser_type})")
         return Failure(msg, position, name=name)
 
-    return PrimitiveParser(f, s)
+    return PrimitiveParser(f, s, length)
 
 
-def regex(pattern: str) -> Parser:
+@interned
+def regex(pattern: str,
+          overrun: Optional[Callable[[str, int], Optional[int]]] = None) -> Parser:
     """Regex function.
 
     Returns a function that parses the beginning of the
     received string with the regular expression pattern.
+    The pattern is compiled once and matched in place at the position,
+    so ``^`` only matches at the start of the whole string.
 
     Parameters
     ----------
     pattern: str
         a regular expression string.
+    overrun: Optional[Callable[[str, int], Optional[int]]]
+        a function telling how far past its end a match may have
+        examined the target, for patterns too complex to tell it
+        (see PrimitiveParser).
 
     Example
     -------
@@ -59,17 +75,69 @@ def regex(pattern: str) -> Parser:
     parse error at (0): unexpected abc expecting ([1-9][0-9]*) (by regex)
     """
     name: str = f"regex {pattern}"
+    compiled = re.compile(pattern)
+    match = compiled.match
+
     def f(self: PrimitiveParser, target: str,
           position: int = 0) -> ParseResult:
-        m = re.match(pattern, target[position:])
+        m = match(target, position)
         if m:
-            return Success([m.group()], position + len(m.group()), name=name)
+            return Success([m.group()], m.end(), name=name)
         msg = (f"parse error at ({position}):"
                f" unexpected {target[position:position + 5]}"
                f" expecting {pattern} (by {self.parser_type})")
         return Failure(msg, position, name=name)
 
-    return PrimitiveParser(f, pattern)
+    return PrimitiveParser(f, pattern, _lookahead(pattern),
+                           compiled.match("") is not None, overrun)
+
+
+_PEEKING_OPS = {getattr(sre_parse, op) for op in ("ASSERT", "ASSERT_NOT", "GROUPREF", "GROUPREF_EXISTS")}  # noqa: E501
+_REPEAT_OPS = {getattr(sre_parse, op) for op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+               if hasattr(sre_parse, op)}
+
+
+def _ops(sub: "sre_parse.SubPattern") -> Iterator[object]:
+    for op, av in sub:
+        yield op
+        for x in av if isinstance(av, (tuple, list)) else ():
+            nested = x if isinstance(x, list) else [x]
+            for y in nested:
+                if isinstance(y, sre_parse.SubPattern):
+                    yield from _ops(y)
+
+
+def _lookahead(pattern: str) -> Optional[int]:
+    r"""Return how far a failing match of pattern may examine, if bounded.
+
+    Example
+    -------
+    >>> _lookahead("ab|c"), _lookahead(r"\w+"), _lookahead("([1-9][0-9]*)")
+    (3, 2, 2)
+    >>> _lookahead(r"\d+x") is None, _lookahead("a(?=b)") is None
+    (True, True)
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    if any(op in _PEEKING_OPS for op in _ops(parsed)):
+        return None
+    hi: int = parsed.getwidth()[1]
+    if hi < sre_parse.MAXREPEAT:
+        return hi + 1
+    items = list(parsed)
+    while len(items) == 1 and items[0][0] is sre_parse.SUBPATTERN:
+        items = list(items[0][1][-1])
+    if not items or items[-1][0] not in _REPEAT_OPS:
+        return None
+    # only a trailing repeat of single characters is unbounded:
+    # a failure happens within the head or the minimum repeats.
+    minimum, _, item = items[-1][1]
+    head: int = sre_parse.SubPattern(parsed.state, items[:-1]).getwidth()[1]
+    if item.getwidth() != (1, 1) or head >= sre_parse.MAXREPEAT:
+        return None
+    return head + minimum + 1
 
 
 # def char() -> Parser:
@@ -77,11 +145,13 @@ def regex(pattern: str) -> Parser:
 #     return regex(r"\S")
 
 
+@interned
 def none_of(s: str) -> Parser:
     """none_of function.
 
     As the dual of oneOf, none_of(cs) succeeds if the current character
     not in the supplied list of characters cs. Returns the parsed character.
+    Fails at the end of input.
 
     Example
     -------
@@ -89,6 +159,8 @@ def none_of(s: str) -> Parser:
     >>> p = none_of("abcdefg")
     >>> p.exec("hello")
     ['h']
+    >>> p.exec("")
+    parse error at (0): unexpected end of input expecting abcdefg
     >>> chars = choice(token('""'), none_of('",'))
     >>> p = transform(many(chars), lambda x: ["".join(x)])
     >>> text = r'Shirt with ""Haskell"" text'
@@ -102,9 +174,12 @@ def none_of(s: str) -> Parser:
     """  # noqa: E501
     name: str = f"none_of {s}"
 
-    def f(target: str, position: int = 0) -> ParseResult:
+    def f(self: PrimitiveParser, target: str,
+          position: int = 0) -> ParseResult:
         exists: bool = False
         targetChar: str = target[position:position + 1]
+        if not targetChar:
+            return Failure("parse error at (" + str(position) + "): unexpected end of input expecting " + s, position, name=name)  # noqa: E501
         for c in s:
             if targetChar == c:
                 exists = True
@@ -113,7 +188,115 @@ def none_of(s: str) -> Parser:
             return Success([targetChar], position + 1, name=name)
         return Failure("parse error at (" + str(position) + "): unexpected " + targetChar + " expecting " + s, position, name=name)  # noqa: E501
 
-    return Parser(f)
+    return PrimitiveParser(f, s, 1)
+
+
+def _finder(stop: str, charset: bool) -> Callable[[str, int], int]:
+    """Return a function finding the next stop from a position, or -1.
+
+    A charset stop uses the structural index of the active context when
+    it indexes the target and every character of stop.
+    """
+    if charset:
+        search = re.compile("[" + "".join(map(re.escape, stop)) + "]").search
+
+        def find(target: str, position: int) -> int:
+            context = current_context.get()
+            index = context.structural if context is not None else None
+            if index is not None and index.data is target and index.covers(stop):
+                return index.find(stop, position)
+            m = search(target, position)
+            return m.start() if m else -1
+        return find
+    return lambda target, position: target.find(stop, position)
+
+
+@interned
+def take_until(stop: str, charset: bool = False) -> Parser:
+    r"""take_until function.
+
+    Takes every character up to the next occurrence of stop, or up to
+    the end of input, in one str.find (or one precompiled re.search
+    when charset is True, stopping at any character of stop).
+    Returns the text taken as one token; stop itself is not consumed.
+    With charset, a StructuralIndex in the active ParseContext is used
+    instead of the search, so quoted stops are skipped.
+
+    Example
+    -------
+    >>> from simpleparser import take_until, seq, token
+    >>> take_until("*/").exec("a comment */ code")
+    ['a comment ']
+    >>> take_until(",;", charset=True).exec("field;next")
+    ['field']
+    >>> take_until("\n").exec("last line")
+    ['last line']
+    """
+    assert len(stop) > 0, ""
+    name: str = f"take_until {stop}"
+    find = _finder(stop, charset)
+
+    def f(self: PrimitiveParser, target: str,
+          position: int = 0) -> ParseResult:
+        end = find(target, position)
+        if end < 0:
+            end = max(len(target), position)
+        return Success([target[position:end]], end, name=name)
+
+    return PrimitiveParser(f, stop, 1 if charset or len(stop) == 1 else None,
+                           nullable=True)
+
+
+@interned
+def skip_until(stop: str, charset: bool = False) -> Parser:
+    r"""skip_until function.
+
+    Like take_until, but returns no tokens, so the skipped text is
+    never copied.
+
+    Example
+    -------
+    >>> from simpleparser import skip_until, seq, token
+    >>> seq(token("#"), skip_until("\n"), token("\n"), token("x")).exec("# comment\nx")
+    ['#', '\n', 'x']
+    """  # noqa: E501
+    assert len(stop) > 0, ""
+    name: str = f"skip_until {stop}"
+    find = _finder(stop, charset)
+
+    def f(self: PrimitiveParser, target: str,
+          position: int = 0) -> ParseResult:
+        end = find(target, position)
+        if end < 0:
+            end = max(len(target), position)
+        return Success([], end, name=name)
+
+    return PrimitiveParser(f, stop, 1 if charset or len(stop) == 1 else None,
+                           nullable=True)
+
+
+@interned
+def skip_while(chars: str) -> Parser:
+    r"""skip_while function.
+
+    Skips every character in chars from the position, in one
+    precompiled regex match. Returns no tokens.
+
+    Example
+    -------
+    >>> from simpleparser import skip_while, seq, token
+    >>> seq(token("a"), skip_while(" \t"), token("b")).exec("a \t  b")
+    ['a', 'b']
+    """
+    assert len(chars) > 0, ""
+    name: str = f"skip_while {chars}"
+    match = re.compile("[" + "".join(map(re.escape, chars)) + "]*").match
+
+    def f(self: PrimitiveParser, target: str,
+          position: int = 0) -> ParseResult:
+        return Success([], match(target, position).end(), name=name)  # type: ignore  # noqa: E501
+
+    return PrimitiveParser(f, chars, 1, nullable=True)
 
 
 # if __name__ == "__main__":
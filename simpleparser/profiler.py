@@ -0,0 +1,232 @@
+"""a per-node profiler for parser objects."""
+
+import marshal
+import threading
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from simpleparser.parseresult import ParseResult
+from simpleparser.parser import Parser
+
+
+ExecFunction = Callable[[Parser, str, int], ParseResult]
+
+
+class NodeStats:
+    """Statistics of one grammar node."""
+
+    def __init__(self, parser: Parser, index: int) -> None:
+        """Initialize method."""
+        self.parser: Parser = parser
+        self.index: int = index
+        self.label: str = label_of(parser)
+        self.calls: int = 0
+        self.successes: int = 0
+        self.failures: int = 0
+        self.cumtime: float = 0.0
+        self.selftime: float = 0.0
+        self.consumed: int = 0
+        self.callers: Dict[int, List[float]] = {}
+        self.depth: int = 0
+
+    def __repr__(self) -> str:
+        """Return string."""
+        return (f"{self.label}: calls={self.calls} success={self.successes}"
+                f" failure={self.failures} consumed={self.consumed}")
+
+
+def label_of(parser: Parser) -> str:
+    """Return a readable label of the parser.
+
+    Example
+    -------
+    >>> from simpleparser import token, many
+    >>> label_of(token("foo"))
+    "token 'foo'"
+    >>> label_of(many(token("foo")))
+    'many'
+    """
+    if parser.expression:
+        return f"{parser.parser_type} {parser.expression!r}"
+    return parser.parser_type
+
+
+def _exec_owners() -> List[Type[Parser]]:
+    """Return Parser and every subclass which defines its own exec."""
+    owners: List[Type[Parser]] = []
+    pending: List[Type[Parser]] = [Parser]
+    while pending:
+        cls = pending.pop()
+        if "exec" in cls.__dict__:
+            owners.append(cls)
+        pending.extend(cls.__subclasses__())
+    return owners
+
+
+class Profiler:
+    """Profiler class.
+
+    Records call count, success and failure counts, cumulative time,
+    self time and consumed characters for every grammar node executed
+    while the profiler is active.
+    The exec methods are only replaced between ``start`` and ``stop``,
+    so parsers run at full speed when no profiler is active.
+    Only the thread which started the profiler is recorded.
+
+    Example
+    -------
+    >>> from simpleparser import token, many
+    >>> p = many(token("foo"))
+    >>> with Profiler() as prof:
+    ...     p.exec("foofoobar")
+    ['foo', 'foo']
+    >>> [(s.label, s.calls, s.successes, s.failures, s.consumed) for s in prof.stats(sort="")]  # noqa: E501
+    [('many', 1, 1, 0, 6), ("token 'foo'", 3, 2, 1, 6)]
+    """
+
+    def __init__(self) -> None:
+        """Initialize method."""
+        self._nodes: Dict[int, NodeStats] = {}
+        self._stack: List[Tuple[NodeStats, List[float]]] = []
+        self._folded: Dict[Tuple[str, ...], float] = {}
+        self._labels: List[str] = []
+        self._saved: List[Tuple[Type[Parser], Any]] = []
+        self._thread: Optional[int] = None
+
+    def __enter__(self) -> "Profiler":
+        """Start profiling."""
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Stop profiling."""
+        self.stop()
+
+    def start(self) -> None:
+        """Replace the exec methods with the recording ones."""
+        assert not self._saved, "profiler is already running"
+        self._thread = threading.get_ident()
+        for cls in _exec_owners():
+            original = cls.__dict__["exec"]
+            self._saved.append((cls, original))
+            setattr(cls, "exec", self._wrap(original))
+
+    def stop(self) -> None:
+        """Restore the original exec methods."""
+        while self._saved:
+            cls, original = self._saved.pop()
+            setattr(cls, "exec", original)
+        self._thread = None
+
+    def _wrap(self, original: ExecFunction) -> ExecFunction:
+        def exec(parser: Parser, s: str, i: int = 0) -> ParseResult:
+            if threading.get_ident() != self._thread:
+                return original(parser, s, i)
+            return self._call(original, parser, s, i)
+
+        exec.__doc__ = original.__doc__
+        return exec
+
+    def _call(self, original: ExecFunction, parser: Parser,
+              s: str, i: int) -> ParseResult:
+        node = self._nodes.get(id(parser))
+        if node is None:
+            node = NodeStats(parser, len(self._nodes))
+            self._nodes[id(parser)] = node
+        caller = self._stack[-1][0].index if self._stack else -1
+        children: List[float] = [0.0]
+        self._stack.append((node, children))
+        self._labels.append(node.label)
+        node.depth += 1
+        start = perf_counter()
+        try:
+            result = original(parser, s, i)
+        finally:
+            elapsed = perf_counter() - start
+            node.depth -= 1
+            path = tuple(self._labels)
+            self._labels.pop()
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1][0] += elapsed
+        own = elapsed - children[0]
+        node.calls += 1
+        node.selftime += own
+        if node.depth == 0:
+            node.cumtime += elapsed
+        edge = node.callers.setdefault(caller, [0, 0.0, 0.0])
+        edge[0] += 1
+        edge[1] += own
+        edge[2] += elapsed
+        self._folded[path] = self._folded.get(path, 0.0) + own
+        if result.success:
+            node.successes += 1
+            node.consumed += max(result.position - i, 0)
+        else:
+            node.failures += 1
+        return result
+
+    def stats(self, sort: str = "selftime") -> List[NodeStats]:
+        """Return recorded node statistics.
+
+        Parameters
+        ----------
+        sort
+            The NodeStats attribute to sort by (descending).
+            Nodes are listed in first-call order when sort is empty.
+        """
+        nodes = sorted(self._nodes.values(), key=lambda n: n.index)
+        if sort:
+            nodes.sort(key=lambda n: getattr(n, sort), reverse=True)
+        return nodes
+
+    def report(self, sort: str = "selftime", limit: int = 20) -> str:
+        """Return a hot path report as a text table.
+
+        Example
+        -------
+        >>> from simpleparser import token
+        >>> with Profiler() as prof:
+        ...     _ = token("foo").exec("foo")
+        >>> print(prof.report().splitlines()[0])
+            calls  success  failure   consumed   cumtime(s)  selftime(s)  node
+        """
+        lines = [f"{'calls':>9}{'success':>9}{'failure':>9}{'consumed':>11}"
+                 f"{'cumtime(s)':>13}{'selftime(s)':>13}  node"]
+        for node in self.stats(sort)[:limit]:
+            lines.append(f"{node.calls:>9}{node.successes:>9}{node.failures:>9}"
+                         f"{node.consumed:>11}{node.cumtime:>13.6f}"
+                         f"{node.selftime:>13.6f}  {node.label} #{node.index}")
+        return "\n".join(lines)
+
+    def folded(self) -> List[str]:
+        """Return flamegraph folded stacks in microseconds of self time.
+
+        Example
+        -------
+        >>> from simpleparser import token, seq
+        >>> with Profiler() as prof:
+        ...     _ = seq(token("a"), token("b")).exec("ab")
+        >>> [line.rsplit(" ", 1)[0] for line in prof.folded()]
+        ['seq', "seq;token 'a'", "seq;token 'b'"]
+        """
+        return [f"{';'.join(path)} {int(t * 1e6)}"
+                for path, t in sorted(self._folded.items())]
+
+    def dump_folded(self, path: str) -> None:
+        """Write folded stacks for flamegraph.pl or speedscope."""
+        with open(path, "w", encoding="utf-8") as f:
+            for line in self.folded():
+                f.write(line + "\n")
+
+    def dump_stats(self, path: str) -> None:
+        """Write the statistics in the format loaded by pstats.Stats."""
+        keys = {n.index: ("simpleparser", n.index, n.label)
+                for n in self._nodes.values()}
+        stats = {}
+        for node in self._nodes.values():
+            callers = {keys[c]: (e[0], e[0], e[1], e[2])
+                       for c, e in node.callers.items() if c in keys}
+            stats[keys[node.index]] = (node.calls, node.calls, node.selftime,
+                                       node.cumtime, callers)
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
@@ -0,0 +1,167 @@
+"""an asyncio streaming front-end."""
+
+import asyncio
+import codecs
+import copy
+import re
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple, Union
+from simpleparser.incremental import IncrementalContext
+from simpleparser.parser import Parser
+from simpleparser.parseresult import ParseResult, Failure
+
+
+Chunk = Union[bytes, str]
+
+_POSITION = re.compile(r"parse error at \((\d+)\)")
+
+
+async def _chunks(source: Union[asyncio.StreamReader, AsyncIterable[Chunk]],
+                  chunk_size: int) -> AsyncIterator[Chunk]:
+    if isinstance(source, asyncio.StreamReader):
+        while True:
+            block = await source.read(chunk_size)
+            if not block:
+                return
+            yield block
+    else:
+        async for data in source:
+            yield data
+
+
+def _parse_window(parser: Parser, window: str, pos: int, final: bool,
+                  limit: Optional[int] = None) -> Tuple[List[ParseResult], int]:
+    """Parse the complete records of window from pos.
+
+    A record is complete when it ends before the end of the window, or
+    when the input is final. Returns the results and the end of the last
+    complete record; a failure is returned only when it is final, or
+    when it examined no character beyond the window, so that no more
+    data can make the record parse.
+    """
+    results: List[ParseResult] = []
+    while pos < len(window) and (limit is None or len(results) < limit):
+        result = parser.exec(window, pos)
+        if result.success and pos < result.position < len(window):
+            results.append(result)
+            pos = result.position
+            continue
+        if not final and not result.success:
+            # run the failing record again, measuring the range it examines.
+            context = IncrementalContext()
+            context.exec(parser, window[pos:])
+            final = context.reach <= len(window) - pos
+        if final:
+            if result.success and result.position == pos:
+                break
+            results.append(result)
+            pos = result.position if result.success else len(window)
+            if not result.success:
+                break
+            continue
+        break
+    return results, pos
+
+
+async def aparse(parser: Parser,
+                 source: Union[asyncio.StreamReader, AsyncIterable[Chunk]],
+                 encoding: str = "utf-8",
+                 chunk_size: int = 1 << 16,
+                 interval: float = 0.005,
+                 executor: Optional[Executor] = None,
+                 max_record: int = 1 << 24) -> AsyncIterator[ParseResult]:
+    r"""Parse records from a stream as the data arrives.
+
+    parser parses one record; it is run repeatedly, each time at the
+    end of the previous record, over a window holding the unparsed
+    rest of the data received so far.
+    A record which reaches the end of the window is parsed again once
+    more data arrives, so the memory held is about the size of the
+    largest record plus one chunk.
+
+    Parameters
+    ----------
+    parser
+        The parser of one record.
+    source
+        An asyncio.StreamReader, or an async iterable of bytes or str
+        chunks.
+    encoding
+        The encoding of bytes chunks, decoded incrementally.
+    chunk_size
+        The size of the reads from a StreamReader.
+    interval
+        The longest time in seconds parsing runs without giving control
+        back to the event loop.
+    executor
+        Parse each chunk in this executor instead of the event loop.
+    max_record
+        The longest unparsed text waiting for more data; a record still
+        incomplete beyond it is parsed as if the input ended there.
+
+    Yields
+    ------
+    ParseResult
+        The result of every record, with its position and message in
+        the whole stream. A failing record ends the stream.
+
+    Example
+    -------
+    >>> import asyncio
+    >>> from simpleparser.builtin_parsers import csv_record
+    >>> async def main():
+    ...     reader = asyncio.StreamReader()
+    ...     reader.feed_data("a,b\nc,".encode())
+    ...     reader.feed_data("d\ne,f".encode())
+    ...     reader.feed_eof()
+    ...     return [(r.tokens[0], r.position) async for r in aparse(csv_record(), reader)]
+    >>> asyncio.run(main())
+    [(['a', 'b'], 4), (['c', 'd'], 8), (['e', 'f'], 11)]
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    loop = asyncio.get_running_loop()
+    window = ""
+    offset = 0
+    final = False
+    chunks = _chunks(source, chunk_size).__aiter__()
+    resumed = time.perf_counter()
+    while not final:
+        try:
+            data = await chunks.__anext__()
+            text = data if isinstance(data, str) else decoder.decode(data)
+        except StopAsyncIteration:
+            text, final = decoder.decode(b"", final=True), True
+        window += text
+        pos = 0
+        while True:
+            last = final or len(window) - pos > max_record
+            if executor is not None:
+                results, pos = await loop.run_in_executor(
+                    executor, _parse_window, parser, window, pos, last)
+            else:
+                results, pos = _parse_window(parser, window, pos, last, 1)
+            for result in results:
+                yield _shifted(result, offset)
+                if not result.success:
+                    return
+            if time.perf_counter() - resumed > interval:
+                await asyncio.sleep(0)
+                resumed = time.perf_counter()
+            if executor is not None or not results:
+                break
+        window, offset = window[pos:], offset + pos
+
+
+def _shifted(result: ParseResult, offset: int) -> ParseResult:
+    """Return the result with its position and message moved by offset."""
+    if not offset:
+        return result
+    if result.success:
+        result = copy.copy(result)
+        result.position += offset
+        return result
+    message = _POSITION.sub(lambda m: f"parse error at ({int(m.group(1)) + offset})",
+                            result.message)
+    return Failure(message, result.position + offset,
+                   children=result.children, name=result.name)
@@ -0,0 +1,110 @@
+"""a structural index module."""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+
+Data = Union[str, bytes, bytearray, memoryview, Any]
+
+
+class StructuralIndex:
+    r"""Structural index class.
+
+    Finds the positions of every structural character of a text at once
+    with NumPy vectorized comparisons, a block at a time, so parsers can
+    jump from one structural position to the next instead of scanning
+    characters in Python.
+    Characters inside quoted regions are not structural: a running XOR
+    of the quote mask marks them, so doubled quotes ("") stay inside.
+
+    For a str the positions are character offsets (the text is compared
+    as UTF-32 code points); for bytes, bytearray or an mmap they are
+    byte offsets.
+    NumPy is required; it is imported when an index is built.
+
+    Parameters
+    ----------
+    data
+        The text, as str, or bytes-like (e.g. an mmap).
+    chars
+        The structural characters to index.
+    quote
+        The quote character, or None if the format has no quoting.
+    block
+        The number of characters compared at once.
+
+    Example
+    -------
+    >>> index = StructuralIndex('a,"b,c"\nd,e\n')
+    >>> list(index.positions[","]), index.find(",\n", 2)
+    ([1, 9], 7)
+    >>> list(index.records())
+    ['a,"b,c"\n', 'd,e\n']
+    """
+
+    def __init__(self, data: Data, chars: str = ",\r\n",
+                 quote: Optional[str] = '"', block: int = 1 << 22) -> None:
+        """Initialize method."""
+        import numpy as np  # type: ignore
+
+        self.data: Data = data
+        self.chars: str = chars
+        self.quote: Optional[str] = quote
+        self.positions: Dict[str, "array[int]"] = {c: array("q") for c in chars}
+        self.length: int = len(data)
+        inside = False
+        for start in range(0, self.length, block):
+            piece = data[start:start + block]
+            if isinstance(piece, str):
+                codes = np.frombuffer(piece.encode("utf-32-le"), dtype="<u4")
+            else:
+                codes = np.frombuffer(piece, dtype=np.uint8)
+            outside = None
+            if quote is not None:
+                quoted = np.logical_xor.accumulate(codes == ord(quote))
+                if inside:
+                    quoted = ~quoted
+                inside = bool(quoted[-1])
+                outside = ~quoted
+            for c in chars:
+                mask = codes == ord(c)
+                if outside is not None:
+                    mask &= outside
+                found = np.flatnonzero(mask).astype(np.int64) + start
+                self.positions[c].frombytes(found.tobytes())
+
+    def covers(self, chars: str) -> bool:
+        """Return whether every character of chars is indexed."""
+        return all(c in self.positions for c in chars)
+
+    def find(self, chars: str, position: int) -> int:
+        """Return the first structural position of any of chars from position, or -1."""  # noqa: E501
+        best = -1
+        for c in chars:
+            positions = self.positions[c]
+            k = bisect_left(positions, position)
+            if k < len(positions) and (best < 0 or positions[k] < best):
+                best = positions[k]
+        return best
+
+    def spans(self, sep: str = "\n") -> Iterator[Tuple[int, int]]:
+        """Yield the (start, end) of every record ended by an unquoted sep.
+
+        The record includes its separator; a last record without one
+        ends at the end of the data.
+        """
+        start = 0
+        for position in self.positions[sep]:
+            yield start, position + 1
+            start = position + 1
+        if start < self.length:
+            yield start, self.length
+
+    def records(self, sep: str = "\n",
+                encoding: str = "utf-8") -> Iterator[str]:
+        """Yield the text of every record, decoding bytes-like data."""
+        data = self.data
+        for start, end in self.spans(sep):
+            record = data[start:end]
+            yield record if isinstance(record, str) else bytes(record).decode(encoding)  # noqa: E501
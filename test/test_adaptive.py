@@ -0,0 +1,68 @@
+"""test of the adaptive memoization."""
+
+import time
+from pathlib import Path
+import pytest
+from simpleparser import (token, regex, seq, choice, many, sep_by, lazy, Parser, ParseContext, AdaptiveContext, MemoPlan,
+                          BudgetExceeded)
+from simpleparser.builtin_parsers import csv_record
+from benchmark.corpora import ambiguous_corpus, record_corpus
+
+
+def _ambiguous() -> Parser:
+    a = token("a")
+    s = choice(seq(a, lazy(lambda: s), token("b")), seq(a, lazy(lambda: s)), a)
+    return s
+
+
+def test_adaptive_ambiguous_1() -> None:
+    """test_adaptive_ambiguous_1."""
+    s = _ambiguous()
+    context = AdaptiveContext()
+    for line in ambiguous_corpus(300).splitlines():
+        assert context.exec(s, line).tokens == s.exec(line).tokens
+    assert context.memoized
+    start = time.perf_counter()
+    assert len(context.exec(s, "a" * 60 + "b" * 30).tokens) == 90
+    assert time.perf_counter() - start < 1
+
+
+def test_adaptive_deterministic_1() -> None:
+    """test_adaptive_deterministic_1."""
+    p = many(csv_record())
+    text = record_corpus(20000)
+    context = AdaptiveContext(sample=1)
+    assert context.exec(p, text).tokens == p.exec(text).tokens
+    assert context.memoized == set()
+    assert context.memo == {}
+    assert sum(calls for calls, _ in context.counts.values()) > 0
+
+
+def test_adaptive_plan_1(tmp_path: Path) -> None:
+    """test_adaptive_plan_1."""
+    s = _ambiguous()
+    context = AdaptiveContext()
+    context.exec(s, "a" * 30)
+    path = str(tmp_path / "plan.json")
+    context.memo_plan(s).dump(path)
+    plan = MemoPlan.load(path)
+    assert plan.nodes == context.memo_plan(s).nodes
+    replay = AdaptiveContext(plan=plan, sample=None)
+    assert replay.exec(s, "a" * 30 + "b").tokens == ["a"] * 30 + ["b"]
+    assert replay.memoized == context.memoized
+    assert replay.counts == {}
+    t = _ambiguous()
+    assert AdaptiveContext(plan=plan).exec(t, "aab").tokens == ["a", "a", "b"]
+    with pytest.raises(ValueError):
+        AdaptiveContext(plan=plan).exec(sep_by(regex("[0-9]+"), token(",")), "1,2")
+
+
+def test_adaptive_budget_1() -> None:
+    """test_adaptive_budget_1."""
+    s = _ambiguous()
+    result = AdaptiveContext(max_steps=100).exec(s, "a" * 40)
+    assert isinstance(result, BudgetExceeded)
+    assert result.reason == "steps"
+    result = ParseContext(max_steps=100).exec(s, "a" * 40)
+    assert isinstance(result, BudgetExceeded) and result.reason == "steps"
+    assert len(AdaptiveContext(max_steps=10000).exec(s, "a" * 40).tokens) == 40
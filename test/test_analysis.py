@@ -0,0 +1,76 @@
+"""test of the grammar analysis."""
+
+import warnings
+from typing import Dict
+import pytest
+from simpleparser import (
+    token, regex, none_of, many, option, seq, choice, sep_by, end_by, lazy,
+    Parser
+)
+from simpleparser.analysis import NullableLoopWarning, nullable, walk
+from simpleparser.builtin_parsers import spaces
+
+
+def test_nullable_1() -> None:
+    """test_nullable_1."""
+    a = token("a")
+    assert not nullable(a)
+    assert not nullable(none_of("a"))
+    assert nullable(spaces())
+    assert nullable(sep_by(a, token(",")))
+    assert not nullable(seq(option(a), a))
+    assert nullable(choice(a, option(a)))
+
+
+def test_nullable_recursive_1() -> None:
+    """test_nullable_recursive_1."""
+    p: Parser = choice(seq(token("("), lazy(lambda: p), token(")")), lazy(lambda: q))  # noqa E501
+    q: Parser = option(token("x"))
+    assert nullable(p)
+    assert len(list(walk(p))) == 8
+
+
+class _Forward:
+    """a grammar whose rules refer to attributes defined later."""
+
+    def __init__(self) -> None:
+        self.item = many(seq(token("("), lazy(lambda: self.expr), token(")")))
+        self.expr: Parser = option(self.item)
+
+
+def test_nullable_forward_1() -> None:
+    """test_nullable_forward_1."""
+    grammar = _Forward()
+    assert grammar.item.exec("(())()").tokens == ["(", "(", ")", ")", "(", ")"]
+    rules: Dict[str, Parser] = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        loop = many(lazy(lambda: rules["x"]))
+    rules["x"] = option(token("x"))
+    assert nullable(loop)
+    assert loop.exec("xxy").tokens == ["x", "x"]
+    assert len(list(walk(loop))) == 4
+
+
+def test_nullable_loop_warning_1() -> None:
+    """test_nullable_loop_warning_1."""
+    with pytest.warns(NullableLoopWarning) as w:
+        many(option(token("a")))
+    assert w[0].filename == __file__
+    with pytest.warns(NullableLoopWarning) as w:
+        sep_by(regex("a*"), option(token(",")))
+    assert w[0].filename == __file__
+    with pytest.warns(NullableLoopWarning) as w:
+        end_by(spaces(), option(token(";")))
+    assert w[0].filename == __file__
+
+
+@pytest.mark.filterwarnings("ignore::simpleparser.analysis.NullableLoopWarning")
+def test_nullable_loop_1() -> None:
+    """test_nullable_loop_1."""
+    assert many(option(token("a"))).exec("aab").tokens == ["a", "a"]
+    assert many(option(token("a"))).exec("b").position == 0
+    assert many(regex("a*")).exec("aaa").position == 3
+    assert sep_by(option(token("a")), option(token(","))).exec("a,,ab").position == 4  # noqa E501
+    assert end_by(option(token("a")), option(token(";"))).exec("a;b").position == 2  # noqa E501
+    assert many(none_of(",")).exec("ab").tokens == ["a", "b"]
@@ -0,0 +1,49 @@
+"""test of builtin_parsers."""
+
+import json
+from simpleparser import token, none_of, many, choice, seq, transform, sep_by, Parser
+from simpleparser.builtin_parsers import (
+    newline, csv_field, csv_record, json_value, floating, integer
+)
+
+
+def test_singleton_1() -> None:
+    """test_singleton_1."""
+    assert newline() is newline()
+    assert csv_record() is csv_record()
+    assert csv_record(unquote=True) is not csv_record()
+
+
+def test_csv_field_1() -> None:
+    """test_csv_field_1."""
+    dq_escaped = token('""')
+    chars = transform(many(choice(dq_escaped, none_of('",\n\r'))), lambda x: ["".join(x)])  # noqa E501
+    quoted = transform(seq(token('"'), many(choice(dq_escaped, none_of('"'))), token('"')), lambda x: ["".join(x)])  # noqa E501
+    hand_rolled: Parser = sep_by(choice(quoted, chars), token(","))
+    builtin: Parser = sep_by(csv_field(), token(","))
+    for line in ['"a",b', 'x""y,"1, 2"', '"Shirt with ""Haskell"" text",20', ",a", ""]:  # noqa E501
+        assert builtin.exec(line).tokens == hand_rolled.exec(line).tokens, line
+        assert builtin.exec(line).position == hand_rolled.exec(line).position
+
+
+def test_csv_record_1() -> None:
+    """test_csv_record_1."""
+    p = many(csv_record(unquote=True))
+    assert p.exec('a,,"c\r\nd"\n"e"\r').tokens == [["a", "", "c\r\nd"], ["e"]]
+
+
+def test_numbers_1() -> None:
+    """test_numbers_1."""
+    for text in ["0", "-12", "3.25", "1e10", "-2.5E-3"]:
+        assert floating().exec(text).tokens == [text]
+        assert float(text) == float(floating().exec(text).tokens[0])
+    assert integer().exec("12.5").tokens == ["12"]
+
+
+def test_json_value_1() -> None:
+    """test_json_value_1."""
+    value = {"a": [1, {"b": 'c"d'}], "e": True}
+    text = json.dumps(value)
+    result = json_value().exec("[" + text + "]", 1)
+    assert result.tokens == [value]
+    assert result.position == len(text) + 1
@@ -0,0 +1,133 @@
+"""test of the parse result cache."""
+
+import os
+import subprocess
+import sys
+import types
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+import pytest
+from simpleparser import (token, regex, seq, sep_by, many, transform, recover, lazy, choice, ParseContext, ResultCache,
+                          Recovered)
+from simpleparser.cache import fingerprint
+from simpleparser.builtin_parsers import csv_record
+from benchmark.corpora import record_corpus
+
+
+def test_cache_lru_1() -> None:
+    """test_cache_lru_1."""
+    p = many(csv_record())
+    lines = record_corpus(500).splitlines(keepends=True)
+    cache = ResultCache(maxsize=3)
+    for _ in range(2):
+        for line in lines[:3]:
+            assert cache.exec(p, line).tokens == p.exec(line).tokens
+    assert (cache.hits, cache.misses, cache.evictions) == (3, 3, 0)
+    for line in lines[3:]:
+        cache.exec(p, line)
+    assert len(cache) == 3
+    assert cache.evictions == len(lines) - 3
+    cache.exec(p, lines[-1])
+    cache.exec(p, lines[0])
+    assert (cache.hits, cache.misses) == (4, len(lines) + 1)
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0
+
+
+def test_cache_key_1() -> None:
+    """test_cache_key_1."""
+    cache = ResultCache()
+    num = regex("[0-9]+")
+    p = sep_by(num, token(","))
+    assert cache.exec(p, "1,2").tokens == ["1", "2"]
+    assert cache.exec(p, "1,2", 2).tokens == ["2"]
+    q = transform(p, lambda tokens: [sum(map(int, tokens))])
+    assert cache.exec(q, "1,2").tokens == [3]
+    assert cache.misses == 3
+    assert not cache.exec(num, "x").success
+    assert not cache.exec(num, "x").success
+    assert cache.hits == 1
+
+
+def test_cache_budget_1() -> None:
+    """test_cache_budget_1."""
+    cache = ResultCache()
+    p = many(token("a"))
+    assert not cache.exec(p, "aaaa", context=ParseContext(max_steps=2)).success
+    assert cache.exec(p, "aaaa", context=ParseContext()).tokens == ["a"] * 4
+    assert cache.misses == 2
+
+
+def test_cache_disk_1(tmp_path: Path) -> None:
+    """test_cache_disk_1."""
+    directory = str(tmp_path / "results")
+    p = recover(seq(regex("[0-9]+"), token(";")), token(";"))
+    first = ResultCache(directory=directory)
+    result = first.exec(p, "1;x;2;")
+    q = transform(token("a"), lambda tokens: [tuple(tokens)])
+    assert first.exec(q, "a").tokens == [("a",)]
+    assert len(os.listdir(directory)) == 1
+    second = ResultCache(directory=directory)
+    loaded = second.exec(p, "1;x;2;")
+    assert (second.disk_hits, second.misses) == (1, 0)
+    assert loaded.tokens == result.tokens == ["1", ";", "2", ";"]
+    assert isinstance(loaded, Recovered) and isinstance(result, Recovered)
+    assert [e.position for e in loaded.errors] == [e.position for e in result.errors]
+    assert second.exec(q, "a").tokens == [("a",)]
+    assert second.misses == 1
+
+
+def test_cache_fingerprint_1() -> None:
+    """test_cache_fingerprint_1."""
+    a = token("a")
+    s = choice(seq(a, lazy(lambda: s)), a)
+    t = choice(seq(a, lazy(lambda: t)), a)
+    assert fingerprint(s) == fingerprint(t)
+    assert fingerprint(s) != fingerprint(choice(seq(a, lazy(lambda: s)), token("b")))
+    code = "from simpleparser.cache import fingerprint; from simpleparser.builtin_parsers import csv_record;" \
+           " from simpleparser import none_of; print(fingerprint(csv_record()), fingerprint(none_of('abcdef')))"
+    outputs = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                              env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+               for seed in ("1", "2")}
+    assert len(outputs) == 1
+
+
+class _Suffix:
+    def __init__(self, suffix: str) -> None:
+        self.suffix = suffix
+
+    def apply(self, tokens: List[str]) -> List[str]:
+        return [t + self.suffix for t in tokens]
+
+
+def test_cache_fingerprint_2(tmp_path: Path) -> None:
+    """test_cache_fingerprint_2."""
+    a, b = _Suffix("-a"), _Suffix("-b")
+    p, q = transform(regex("[a-z]+"), a.apply), transform(regex("[a-z]+"), b.apply)
+    assert fingerprint(p) != fingerprint(q)
+    assert fingerprint(p) == fingerprint(transform(regex("[a-z]+"), a.apply))
+    cache = ResultCache(directory=str(tmp_path))
+    assert cache.exec(p, "x").tokens == ["x-a"]
+    assert cache.exec(q, "x").tokens == ["x-b"]
+    # bound to an instance of this process only: not written to disk.
+    assert os.listdir(str(tmp_path)) == []
+    namespace = types.SimpleNamespace(suffix="-c")
+    r = transform(regex("[a-z]+"), lambda tokens: [t + namespace.suffix for t in tokens])
+    with pytest.raises(ValueError):
+        fingerprint(r)
+    assert cache.exec(r, "x").tokens == ["x-c"]
+    namespace.suffix = "-d"
+    assert cache.exec(r, "x").tokens == ["x-d"]
+    assert cache.misses == 4
+
+
+def test_cache_thread_1() -> None:
+    """test_cache_thread_1."""
+    p = many(csv_record())
+    lines = record_corpus(1000).splitlines(keepends=True)
+    cache = ResultCache(maxsize=8)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda line: cache.exec(p, line).tokens, lines * 4))
+    assert results == [p.exec(line).tokens for line in lines * 4]
+    assert cache.hits + cache.misses == len(lines) * 4
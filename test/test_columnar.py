@@ -0,0 +1,62 @@
+"""test of the typed columnar output."""
+
+import pytest
+from simpleparser import many, regex, token, seq, skip, Columns
+from simpleparser.builtin_parsers import csv_record
+from benchmark.corpora import numeric_corpus
+
+SCHEMA = [("id", int), ("price", float), ("quantity", int)]
+
+
+def test_columns_1() -> None:
+    """test_columns_1."""
+    text = numeric_corpus(20000)
+    rows = many(csv_record()).exec(text).tokens
+    columns = Columns(SCHEMA, block=7)
+    for row in rows:
+        columns.append(row)
+    columns.finish()
+    assert len(columns) == len(rows)
+    assert list(columns["id"]) == [int(r[0]) for r in rows]
+    assert list(columns["price"]) == [float(r[1]) for r in rows]
+    assert columns["quantity"].typecode == "q"
+
+
+def test_exec_columns_1() -> None:
+    """test_exec_columns_1."""
+    record = seq(regex("[a-z]+"), skip(token("=")), regex("[0-9]+"), skip(token(";")))  # noqa E501
+    columns = record.exec_columns("a=1;b=22;c=x;", [("key", str), ("value", int)])  # noqa E501
+    assert columns["key"] == ["a", "b"]
+    assert list(columns["value"]) == [1, 22]
+    assert columns.position == 9
+    assert columns.error is not None and not columns.error.success
+
+
+def test_exec_columns_2() -> None:
+    """test_exec_columns_2."""
+    text = "".join(f"{k},{k}.5,1\n" for k in range(10)) + "x,1,1\n2,2,2\n"
+    columns = Columns(SCHEMA, block=4)
+    for row in many(csv_record()).exec(text).tokens:
+        columns.append(row)
+    columns.finish()
+    assert len(columns) == 10 and columns.position == 10
+    columns = csv_record().exec_columns(text, SCHEMA)
+    assert list(columns["id"]) == list(range(10))
+    assert columns.position == text.index("x")
+    assert columns.error is not None and columns.error.position == columns.position
+    assert "'x'" in str(columns.error)
+
+
+def test_exec_columns_numpy_1() -> None:
+    """test_exec_columns_numpy_1."""
+    np = pytest.importorskip("numpy")
+    text = numeric_corpus(20000)
+    expected = csv_record().exec_columns(text, SCHEMA)
+    columns = csv_record().exec_columns(text, SCHEMA, numpy=True)
+    assert isinstance(columns["price"], np.ndarray)
+    assert columns["id"].dtype == np.int64
+    assert columns["price"].tolist() == list(expected["price"])
+    bad = "1,1.5,1\n2,y,2\n"
+    columns = csv_record().exec_columns(bad, SCHEMA, numpy=True)
+    assert columns["id"].tolist() == [1] and columns["id"].dtype == np.int64
+    assert columns.error is not None and columns.error.position == 8
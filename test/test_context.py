@@ -0,0 +1,71 @@
+"""test of the parse context budget."""
+
+import time
+from simpleparser import (
+    token, choice, seq, skip, lazy, Parser, ParseContext, BudgetExceeded
+)
+
+
+def _exponential() -> Parser:
+    """a grammar backtracking 2^n times on a run of n a's without b."""
+    a = token("a")
+    p: Parser = choice(seq(a, lazy(lambda: p), token("b")), seq(a, lazy(lambda: p)), a)  # noqa E501
+    return p
+
+
+def test_budget_steps_1() -> None:
+    """test_budget_steps_1."""
+    p = _exponential()
+    result = ParseContext(max_steps=10000).exec(p, "a" * 40)
+    assert isinstance(result, BudgetExceeded)
+    assert not result.success
+    assert result.reason == "steps"
+    assert 0 < result.position <= 40
+    assert ParseContext(max_steps=10000).exec(p, "a" * 5).tokens == ["a"] * 5
+
+
+def test_budget_not_backtracked_1() -> None:
+    """test_budget_not_backtracked_1."""
+    slow = seq(token("a"), token("a"), token("a"))
+    p = choice(slow, token("a"))
+    result = ParseContext(max_steps=4).exec(p, "aaa")
+    assert isinstance(result, BudgetExceeded)
+    assert result.position == 2
+
+
+def test_budget_timeout_1() -> None:
+    """test_budget_timeout_1."""
+    p = _exponential()
+    start = time.monotonic()
+    result = ParseContext(timeout=0.05).exec(p, "a" * 60)
+    assert time.monotonic() - start < 5
+    assert isinstance(result, BudgetExceeded)
+    assert result.reason == "timeout"
+
+
+def test_budget_memo_1() -> None:
+    """test_budget_memo_1."""
+    p = _exponential()
+    result = ParseContext(memo=True, max_memo=50).exec(p, "a" * 40)
+    assert isinstance(result, BudgetExceeded)
+    assert result.reason == "memo"
+    ctx = ParseContext(memo=True, max_memo=1000)
+    assert ctx.exec(p, "a" * 40).tokens == ["a"] * 40
+    assert ctx.memo is not None and len(ctx.memo) <= 1000
+
+
+def test_budget_batch_1() -> None:
+    """test_budget_batch_1."""
+    record = seq(_exponential(), skip(token(";")))
+    inputs = ["aaa;", "a" * 40 + ";", "aaa;"]
+    for fuse in (False, True):
+        batch = record.exec_batch(inputs, fuse=fuse, context=ParseContext(max_steps=10000))
+        assert list(batch.success) == [1, 0, 1]
+        assert batch.tokens is not None and batch.tokens[2] == ["a"] * 3
+        result = batch[1]
+        assert isinstance(result, BudgetExceeded) and result.reason == "steps"
+        assert list(batch.exceeded) == [1]
+    columns = record.exec_columns("".join(inputs), [("a", str), ("b", str), ("c", str)],
+                                  context=ParseContext(max_steps=10000))
+    assert isinstance(columns.error, BudgetExceeded) and columns.error.reason == "steps"
+    assert columns.position == 4 and len(columns) == 1
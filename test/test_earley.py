@@ -0,0 +1,92 @@
+"""test of the Earley backend."""
+
+import time
+import pytest
+from simpleparser import token, regex, seq, choice, many, option, sep_by, end_by, skip, lazy, transform, Parser, EarleyParser
+from simpleparser.builtin_parsers import csv_field, newline
+from benchmark.corpora import ambiguous_corpus, csv_corpus
+from demo.demo_csv_parser import CsvParser
+
+
+def _ambiguous() -> Parser:
+    a = token("a")
+    s = choice(seq(a, lazy(lambda: s), token("b")), seq(a, lazy(lambda: s)), a)
+    return s
+
+
+def test_earley_csv_1() -> None:
+    """test_earley_csv_1."""
+    record = seq(sep_by(csv_field(), token(",")), newline())
+    text = csv_corpus(3000)
+    p = many(record)
+    result = EarleyParser(p).exec(text)
+    assert result.success
+    assert result.position == len(text)
+    assert result.tokens == p.exec(text).tokens
+
+
+def test_earley_ambiguous_1() -> None:
+    """test_earley_ambiguous_1."""
+    s = _ambiguous()
+    p = EarleyParser(s)
+    for line in ambiguous_corpus(300).splitlines():
+        assert p.exec(line).tokens == s.exec(line).tokens
+    start = time.perf_counter()
+    forest = p.parse("a" * 200 + "b" * 20)
+    assert forest.success
+    assert forest.count() > 10 ** 20
+    assert time.perf_counter() - start < 10
+
+
+def test_earley_trees_1() -> None:
+    """test_earley_trees_1."""
+    e = choice(seq(lazy(lambda: e), token("+"), lazy(lambda: e)), regex("[0-9]"))
+    forest = EarleyParser(e).parse("1+2+3")
+    trees = list(forest.trees())
+    assert len(trees) == forest.count() == 2
+    assert [t.tokens for t in trees] == [["1", "+", "2", "+", "3"]] * 2
+    assert {(t.children[0].start, t.children[0].end) for t in trees} == {(0, 5)}
+    assert {(t.children[0].children[0].end) for t in trees} == {1, 3}
+
+
+def test_earley_nullable_1() -> None:
+    """test_earley_nullable_1."""
+    num = regex("[0-9]+")
+    p = EarleyParser(seq(option(token("-")), sep_by(num, token(",")), token("|"), end_by(num, token(";"))))
+    assert p.exec("|").tokens == ["|"]
+    assert p.exec("-1,2,|3;").tokens == ["-", "1", "2", "|", "3"]
+    assert p.exec("1|3;4;").tokens == ["1", "|", "3", "4"]
+    assert not p.exec("1|3").success
+    q = seq(skip(seq(token("("), num)), many(num))
+    assert EarleyParser(q).exec("(12").tokens == []
+
+
+def test_earley_actions_1() -> None:
+    """test_earley_actions_1."""
+    grammar = CsvParser().parser
+    text = "a,b\nc,d\n"
+    assert EarleyParser(grammar).exec(text).tokens == grammar.exec(text).tokens == [["a", "b"], ["c", "d"]]  # noqa E501
+    num = regex("[0-9]+").map_to(int)
+    pair = seq(num, skip(token(":")), num).map_to(lambda k, v: (k, v))
+    p = transform(sep_by(pair, token(",")).collect(dict), lambda tokens: [len(tokens[0])] + tokens)  # noqa E501
+    assert EarleyParser(p).exec("1:2,3:4").tokens == p.exec("1:2,3:4").tokens == [2, {1: 2, 3: 4}]  # noqa E501
+
+
+def test_earley_failure_1() -> None:
+    """test_earley_failure_1."""
+    p = EarleyParser(many(seq(regex("[0-9]+"), token(";"))))
+    result = p.exec("1;22;x;")
+    assert not result.success
+    assert result.position == 5
+    assert not p.parse("1;22").success
+
+
+def test_earley_cycle_1() -> None:
+    """test_earley_cycle_1."""
+    with pytest.warns(UserWarning):
+        p = many(option(token("z")))
+    forest = EarleyParser(p).parse("zz")
+    tree = forest.first()
+    assert tree is not None and tree.tokens == ["z", "z"]
+    with pytest.raises(ValueError):
+        forest.count()
@@ -0,0 +1,123 @@
+"""test of IncrementalParser."""
+
+import random
+from typing import List, Tuple
+from simpleparser import (
+    token, regex, none_of, choice, seq, many, option, transform, sep_by,
+    end_by, lazy, recover, Parser, ParseResult, IncrementalParser
+)
+from simpleparser.builtin_parsers import newline
+from demo.demo_csv_parser import CsvParser
+from demo.demo_scheme_parser import schemeparser
+
+
+def csv_grammar() -> Parser:
+    """Return the grammar of demo_csv_parser."""
+    dq = token('"')
+    dq_escaped = token('""')
+    chars = transform(many(choice(dq_escaped, none_of('",\n\r'))), lambda x: ["".join(x)])  # noqa E501
+    quoted = transform(seq(dq, many(choice(dq_escaped, none_of('"'))), dq), lambda x: ["".join(x)])  # noqa E501
+    line = transform(sep_by(choice(quoted, chars), token(",")), lambda x: [x] if x else [])  # noqa E501
+    return end_by(line, newline())
+
+
+def json_grammar() -> Parser:
+    """Return the grammar of demo_json_parser."""
+    sq = token("'")
+    p_str = transform(seq(sq, regex(r"\w*"), sq), lambda x: ["".join(x)])
+    p_multi = choice(regex(r"\d+"), p_str, lazy(lambda: obj), lazy(lambda: ary))  # noqa E501
+    ary = seq(token("["), option(sep_by(p_multi, token(","))), token("]"))
+    obj = seq(token("{"), option(sep_by(seq(regex(r"\w+"), token(":"), p_multi), token(","))), token("}"))  # noqa E501
+    return obj
+
+
+def same(a: ParseResult, b: ParseResult) -> bool:
+    """Compare two results, with the errors of Recovered results."""
+    def errors(r: ParseResult) -> List[Tuple[int, str]]:
+        return [(e.position, e.message) for e in getattr(r, "errors", [])]
+    return (a.success, a.tokens, a.position, a.message, errors(a)) == \
+        (b.success, b.tokens, b.position, b.message, errors(b))
+
+
+def check_random_edits(grammar: Parser, text: str, alphabet: str) -> None:
+    """Compare incremental results with fresh parses after random edits."""
+    rnd = random.Random(0)
+    p = IncrementalParser(grammar, text)
+    assert same(p.result, grammar.exec(text))
+    for _ in range(200):
+        offset = rnd.randint(0, len(p.text))
+        deleted = rnd.randint(0, min(3, len(p.text) - offset))
+        inserted = "".join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 3)))  # noqa E501
+        result = p.edit(offset, deleted, inserted)
+        assert same(result, grammar.exec(p.text)), (offset, deleted, inserted)
+
+
+def test_incremental_csv_1() -> None:
+    """test_incremental_csv_1."""
+    text = '"a","b ""c"""\n1,22\n"x, y",333\n' * 10
+    check_random_edits(csv_grammar(), text, 'ab",\n1')
+
+
+def test_incremental_json_1() -> None:
+    """test_incremental_json_1."""
+    text = "{p1:1,p2:'a',p3:[1,[2,3],{q:4}],p4:{r:'s'}}"
+    check_random_edits(json_grammar(), text, "{}[],:'1a")
+
+
+def test_incremental_scheme_1() -> None:
+    """test_incremental_scheme_1."""
+    text = "(define (f x) (g x (h y z)) (k 1 2))"
+    check_random_edits(schemeparser().parser, text, "() abx")
+
+
+def test_incremental_recover_1() -> None:
+    """test_incremental_recover_1."""
+    line = seq(regex("[a-z]+"), token("="), regex("[0-9]+"), token("\n"))
+    grammar = recover(line, token("\n"))
+    p = IncrementalParser(grammar, "\na\nbba1\nb=1bb=abb==b=")
+    assert same(p.edit(21, 0, "=\n\n"), grammar.exec(p.text))
+    check_random_edits(grammar, "a=1\nb=22\nc=x\nd=4\n" * 5, "ab=1\n")
+    check_random_edits(recover(line, regex("\n+")), "a=1\nb=x\n\nc=3\n" * 5, "ab=1\n")
+
+
+def count_runs(p: IncrementalParser, offset: int, deleted: int, inserted: str) -> int:
+    """Return how many parsers an edit runs."""
+    calls = []
+    original = Parser.run
+
+    def counting_run(self: Parser, s: str, i: int = 0) -> ParseResult:
+        calls.append(i)
+        return original(self, s, i)
+
+    Parser.run = counting_run  # type: ignore
+    try:
+        p.edit(offset, deleted, inserted)
+    finally:
+        Parser.run = original  # type: ignore
+    return len(calls)
+
+
+def test_incremental_reuse_1() -> None:
+    """test_incremental_reuse_1."""
+    grammar = csv_grammar()
+    p = IncrementalParser(grammar, "a,b\n" * 100)
+    # only the top level loop and the edited line are parsed again.
+    assert count_runs(p, 200, 1, "xyz") < 50
+    result = p.result
+    assert result.tokens[50] == ["xyz", "b"]
+    assert len(result.tokens) == 100
+
+
+def test_incremental_resume_1() -> None:
+    """test_incremental_resume_1."""
+    grammar = CsvParser().parser
+    for lines in (100, 10000):
+        p = IncrementalParser(grammar, '"a","b ""c"""\n1,22\n' * lines)
+        middle = len(p.text) // 2
+        # the edits re-parse a few lines, however long the document.
+        assert count_runs(p, middle + 2, 0, "x") < 30
+        assert count_runs(p, middle, 0, "3,4\n") < 30
+        assert count_runs(p, len(p.text), 0, "5\n") < 30
+        assert same(p.result, grammar.exec(p.text))
+        assert p.result.tokens[lines - 1:lines + 2] == [["1", "22"], ["3", "4"], ['"ax"', '"b ""c"""']]
+        assert p.result.tokens[-1] == ["5"]
@@ -0,0 +1,48 @@
+"""test of the structural interning of parsers."""
+
+import gc
+import weakref
+from simpleparser import token, regex, none_of, seq, choice, many, sep_by, lazy, Parser, ParseContext  # noqa E501
+from simpleparser.parser import _interned
+
+
+def test_interned_1() -> None:
+    """test_interned_1."""
+    assert token(",") is token(",")
+    assert regex("[0-9]+") is regex("[0-9]+")
+    assert none_of("ab") is none_of("ab")
+    assert token("a") is not regex("a")
+    a = sep_by(regex("[a-z]+"), token(","))
+    assert sep_by(regex("[a-z]+"), token(",")) is a
+    assert seq(a, token(";")) is not seq(token(";"), a)
+
+
+def test_interned_memo_1() -> None:
+    """test_interned_memo_1."""
+    def grammar() -> Parser:
+        return choice(seq(many(token("a")), token("b")), seq(many(token("a")), token("c")))  # noqa E501
+    ctx = ParseContext(memo=True)
+    p = grammar()
+    assert ctx.exec(p, "aaac").tokens == ["a", "a", "a", "c"]
+    # the second alternative reuses the memoized many(token("a")).
+    assert ctx.memo is not None
+    assert len([parser for parser, _ in ctx.memo if parser.parser_type == "token"]) == 6  # noqa E501
+
+
+def test_interned_weak_1() -> None:
+    """test_interned_weak_1."""
+    before = len(_interned)
+    p = seq(token("unique-1"), token("unique-2"))
+    assert len(_interned) == before + 3
+    del p
+    gc.collect()
+    assert len(_interned) == before
+
+    def recursive() -> Parser:
+        a = token("unique-3")
+        q = choice(seq(a, lazy(lambda: q)), a)
+        return q
+    r = weakref.ref(recursive())
+    gc.collect()
+    assert r() is None
+    assert len(_interned) == before
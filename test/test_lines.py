@@ -0,0 +1,35 @@
+"""test of the line index."""
+
+import random
+from simpleparser.lines import LineIndex
+
+
+def _location(text: str, offset: int) -> tuple:
+    """rescan the text from the start."""
+    line, start = 1, 0
+    for i, c in enumerate(text[:offset]):
+        if c == "\n" or (c == "\r" and text[i + 1:i + 2] != "\n"):
+            line, start = line + 1, i + 1
+    return line, offset - start + 1
+
+
+def test_location_1() -> None:
+    """test_location_1."""
+    rng = random.Random(37)
+    for _ in range(50):
+        text = "".join(rng.choice("ab\n\r") for _ in range(rng.randrange(60)))
+        index = LineIndex(text)
+        for offset in range(len(text) + 1):
+            assert index.location(offset) == _location(text, offset), (text, offset)  # noqa E501
+
+
+def test_lines_1() -> None:
+    """test_lines_1."""
+    text = "l1\nl2\r\nl3\rl4"
+    index = LineIndex(text)
+    assert len(index) == 4
+    assert index.lines(1, 1) == "l1\n"
+    assert index.lines(2, 4) == "l2\r\nl3\rl4"
+    assert index.lines(0, 9) == text
+    assert index.span(3, 3) == (7, 10)
+    assert LineIndex("").location(0) == (1, 1)
@@ -49,3 +49,53 @@ def test_many_1() -> None:
     assert p.exec('foofoo').tokens == ['foo', 'foo']
     assert p.exec('bar').message == "parse error at (0): unexpected bar expecting foo (by token)"
     assert p.exec('foobar').tokens == ['foo']
+
+
+def test_exec_batch_1() -> None:
+    """test_exec_batch_1."""
+    from simpleparser import ParseContext, seq, many
+    p = seq(token("a"), many(token("b")))
+    inputs = ["ab", "abbb", "x", "a"]
+    batch = p.exec_batch(inputs, context=ParseContext(memo=True))
+    assert len(batch) == 4
+    assert list(batch.success) == [1, 1, 0, 0]
+    assert list(batch.positions) == [2, 4, 0, 0]
+    assert batch.tokens == [["a", "b"], ["a", "b", "b", "b"], [], []]
+    assert sorted(batch.errors) == [2, 3]
+    assert [r.tokens for r in p.exec_batch(inputs, fuse=True)] == [["a", "b"], ["a", "b", "b", "b"], [], []]  # noqa F501
+
+
+def test_exec_batch_2() -> None:
+    """test_exec_batch_2."""
+    p = regex("a+")
+    batch = p.exec_batch(["aa", "a", "b"], fuse=True, tokens=False)
+    assert batch.tokens is None
+    assert list(batch.success) == [0, 1, 0]
+    assert "past the end of input 0" in batch.errors[0]
+    assert batch.spans()[1] == (2, 3)
+
+
+def test_take_until_1() -> None:
+    """test_take_until_1."""
+    from simpleparser import none_of, many, transform, take_until, skip_until, skip_while  # noqa E501
+    slow = transform(many(none_of(",;")), lambda x: ["".join(x)])
+    fast = take_until(",;", charset=True)
+    for text in ["abc,d", "abc", ";x", "a b;c,"]:
+        for position in range(len(text)):
+            expected = slow.exec(text, position)
+            if expected.success:
+                assert fast.exec(text, position).tokens == expected.tokens
+                assert fast.exec(text, position).position == expected.position
+    assert take_until("-->").exec("a -- b --> c").tokens == ["a -- b "]
+    assert skip_until("-->").exec("a -- b --> c").position == 7
+    assert skip_until("x").exec("abc", 3).position == 3
+    assert skip_while("ab").exec("abbac").position == 4
+
+
+def test_take_until_incremental_1() -> None:
+    """test_take_until_incremental_1."""
+    from simpleparser import IncrementalParser, take_until, sep_by
+    p = IncrementalParser(sep_by(take_until("<>"), token("<>")), "ab<>cd<>ef")
+    assert p.result.tokens == ["ab", "cd", "ef"]
+    assert p.edit(3, 0, "x").tokens == ["ab<x>cd", "ef"]
+    assert p.edit(3, 1, "").tokens == ["ab", "cd", "ef"]
@@ -27,3 +27,27 @@ def test_catch_1() -> None:
         assert result.tokens == []
 
     assert f.exec("foobar").then(f_then).catch(f_catch)
+
+
+def test_token_rope_1() -> None:
+    """test_token_rope_1."""
+    from simpleparser import seq, many, option
+    inner = many(token("a"))
+    p: Parser = inner
+    for _ in range(50):
+        p = seq(p, option(token("b")))
+    result = p.exec("a" * 100 + "b")
+    assert result.tokens == ["a"] * 100 + ["b"]
+    assert result.tokens is result.tokens
+
+
+def test_token_rope_2() -> None:
+    """test_token_rope_2."""
+    from simpleparser import seq, many, TokenRope
+    a = many(token("a"))
+    result = seq(a, token("b"), a).exec("aabaaa")
+    assert isinstance(result.chunk, TokenRope)
+    assert len(result.chunk) == 6
+    # the chunks of the children are shared, not copied.
+    assert result.chunk.parts[0] is result.children[0].chunk
+    assert result.tokens == ["a", "a", "b", "a", "a", "a"]
@@ -0,0 +1,58 @@
+"""test of Profiler."""
+
+import os
+import pstats
+from pathlib import Path
+from simpleparser import token, seq, many, choice, Parser, Profiler
+
+
+def test_profiler_1() -> None:
+    """test_profiler_1."""
+    p: Parser = many(choice(token("a"), token("b")))
+    with Profiler() as prof:
+        assert p.exec("abba").tokens == ["a", "b", "b", "a"]
+    stats = {s.label: s for s in prof.stats()}
+    assert stats["many"].calls == 1
+    assert stats["many"].consumed == 4
+    assert stats["token 'a'"].calls == 5
+    assert stats["token 'a'"].successes == 2
+    assert stats["token 'b'"].failures == 1
+    for s in stats.values():
+        assert s.cumtime >= s.selftime >= 0
+
+
+def test_profiler_2() -> None:
+    """test_profiler_2."""
+    p: Parser = token("a")
+    original = Parser.exec
+    with Profiler():
+        assert Parser.exec is not original
+    assert Parser.exec is original
+    assert p.exec("a").tokens == ["a"]
+
+
+def test_profiler_3(tmp_path: Path) -> None:
+    """test_profiler_3."""
+    p: Parser = seq(token("a"), many(token("b")))
+    with Profiler() as prof:
+        p.exec("abbb")
+    stats_path = os.path.join(str(tmp_path), "parse.prof")
+    prof.dump_stats(stats_path)
+    loaded = pstats.Stats(stats_path)
+    assert loaded.total_calls == 7  # type: ignore
+    folded_path = os.path.join(str(tmp_path), "parse.folded")
+    prof.dump_folded(folded_path)
+    with open(folded_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert "seq;many;token 'b'" in [line.rsplit(" ", 1)[0] for line in lines]
+
+
+def test_profiler_demo_1() -> None:
+    """test_profiler_demo_1."""
+    from demo.demo_csv_parser import CsvParser
+    from demo.demo_json_parser import JsonParser
+    with Profiler() as prof:
+        CsvParser().parse('"a","b"\n1,2\n')
+        JsonParser().parse("{p1:1,p2:[1,2]}")
+    assert "end_by" in prof.report(limit=100)
+    assert sum(s.calls for s in prof.stats()) > 0
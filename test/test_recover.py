@@ -0,0 +1,33 @@
+"""test of the error recovery."""
+
+from simpleparser import token, regex, seq, choice, recover, sep_by, Recovered
+from simpleparser.builtin_parsers import csv_field, newline
+from benchmark.corpora import csv_corpus
+
+
+def test_recover_csv_1() -> None:
+    """test_recover_csv_1."""
+    record = seq(sep_by(csv_field(), token(",")), newline())
+    lines = csv_corpus(5000).splitlines(keepends=True)
+    bad = {3, 10, len(lines) - 1}
+    text = "".join('"open' + line if i in bad else line for i, line in enumerate(lines))  # noqa E501
+    for sync in (newline(), token("\n"), choice(token("\n"), token("\r"))):
+        result = recover(record, sync).exec(text)
+        assert isinstance(result, Recovered)
+        assert result.success
+        assert result.position == len(text)
+        assert len(result.errors) == len(bad)
+        assert [e.position for e in result.errors] == [sum(map(len, lines[:i])) + 5 * sorted(bad).index(i) for i in sorted(bad)]  # noqa E501
+        good = seq(sep_by(csv_field(), token(",")), newline())
+        assert result.tokens == recover(good, newline()).exec("".join(line for i, line in enumerate(lines) if i not in bad)).tokens  # noqa E501
+
+
+def test_recover_2() -> None:
+    """test_recover_2."""
+    p = recover(regex("[0-9]+;"), token(";"))
+    assert p.exec("").tokens == []
+    result = p.exec("1;x;2;yy")
+    assert isinstance(result, Recovered)
+    assert result.tokens == ["1;", "2;"]
+    assert [e.position for e in result.errors] == [2, 6]
+    assert result.position == 8
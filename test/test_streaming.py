@@ -0,0 +1,85 @@
+"""test of the asyncio streaming front-end."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional
+from simpleparser import ParseResult, aparse, regex, seq, token
+from simpleparser.builtin_parsers import csv_record
+from benchmark.corpora import csv_corpus
+
+
+async def _pieces(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def _parse(source: AsyncIterator[bytes],
+           executor: Optional[ThreadPoolExecutor] = None) -> List[ParseResult]:
+    async def main() -> List[ParseResult]:
+        return [r async for r in aparse(csv_record(unquote=True), source, executor=executor)]  # noqa E501
+    return asyncio.run(main())
+
+
+def test_aparse_1() -> None:
+    """test_aparse_1."""
+    text = csv_corpus(20000) + "ü,ß,€\n"
+    data = text.encode()
+    for size in (1, 7, 4096):
+        results = _parse(_pieces(data, size))
+        assert all(r.success for r in results)
+        tokens = [r.tokens[0] for r in results]
+        assert tokens[-1] == ["ü", "ß", "€"]
+        assert len(tokens) == text.count("\n")
+
+
+def test_aparse_executor_1() -> None:
+    """test_aparse_executor_1."""
+    data = ("a,b\n" * 1000).encode()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = _parse(_pieces(data, 100), executor=pool)
+    assert [r.tokens[0] for r in results] == [["a", "b"]] * 1000
+
+
+def test_aparse_error_1() -> None:
+    """test_aparse_error_1."""
+    results = _parse(_pieces(b'a,b\nc,d\n"e,f\n', 3))
+    assert [r.success for r in results] == [True, True, False]
+    assert results[-1].message.startswith("parse error at (8)")
+    assert [r.position for r in results[:2]] == [4, 8]
+
+
+def test_aparse_error_2() -> None:
+    """test_aparse_error_2."""
+    pulled = []
+
+    async def source() -> AsyncIterator[str]:
+        for data in ["1;2", "2;x", ";3;"] + ["4;"] * 1000:
+            pulled.append(data)
+            yield data
+
+    async def main() -> List[ParseResult]:
+        return [r async for r in aparse(seq(regex("[0-9]+"), token(";")), source())]
+    results = asyncio.run(main())
+    assert [r.tokens for r in results] == [["1", ";"], ["22", ";"], []]
+    assert [r.position for r in results] == [2, 5, 5]
+    assert results[-1].message.startswith("parse error at (5)")
+    # the failure waits for the text its message quotes, not for the end.
+    assert len(pulled) == 4
+
+
+def test_aparse_stream_reader_1() -> None:
+    """test_aparse_stream_reader_1."""
+    async def main() -> List[List[str]]:
+        reader = asyncio.StreamReader()
+
+        async def feed() -> None:
+            for i in range(100):
+                reader.feed_data(f"{i},x\n".encode())
+                await asyncio.sleep(0)
+            reader.feed_eof()
+
+        task = asyncio.ensure_future(feed())
+        records = [r.tokens[0] async for r in aparse(csv_record(), reader, chunk_size=16)]  # noqa E501
+        await task
+        return records
+    assert asyncio.run(main()) == [[str(i), "x"] for i in range(100)]
@@ -0,0 +1,58 @@
+"""test of the structural index."""
+
+import mmap
+import tempfile
+import pytest
+from simpleparser import many, take_until, ParseContext
+from simpleparser.builtin_parsers import csv_record
+from benchmark.corpora import csv_corpus
+
+np = pytest.importorskip("numpy")
+from simpleparser.structural import StructuralIndex  # noqa E402
+
+
+def _positions(text: str, char: str) -> list:
+    """scan the text in Python."""
+    inside = False
+    found = []
+    for i, c in enumerate(text):
+        if c == '"':
+            inside = not inside
+        elif c == char and not inside:
+            found.append(i)
+    return found
+
+
+def test_structural_1() -> None:
+    """test_structural_1."""
+    text = csv_corpus(20000) + 'ü,"ß\n€",x\n'
+    for block in (7, 64, 1 << 22):
+        index = StructuralIndex(text, block=block)
+        for c in ",\n":
+            assert list(index.positions[c]) == _positions(text, c)
+    index = StructuralIndex(text)
+    assert index.find(",\n", 0) == min(_positions(text, ",")[0], _positions(text, "\n")[0])  # noqa E501
+    assert index.find("\n", len(text)) == -1
+
+
+def test_structural_records_1() -> None:
+    """test_structural_records_1."""
+    text = csv_corpus(20000)
+    expected = many(csv_record()).exec(text).tokens
+    records = list(StructuralIndex(text).records())
+    assert [csv_record().exec(r).tokens[0] for r in records] == expected
+    with tempfile.TemporaryFile() as f:
+        f.write(text.encode())
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            index = StructuralIndex(m, block=100)
+            assert list(index.records()) == records
+
+
+def test_structural_take_until_1() -> None:
+    """test_structural_take_until_1."""
+    text = '"a,b",c\n'
+    field = take_until(",\n", charset=True)
+    assert field.exec(text).tokens == ['"a']
+    context = ParseContext(structural=StructuralIndex(text))
+    assert context.exec(field, text).tokens == ['"a,b"']
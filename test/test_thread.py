@@ -0,0 +1,39 @@
+"""test of concurrent use of parsers."""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from simpleparser import token, regex, choice, seq, sep_by, Parser, ParseContext
+
+
+def test_immutable_1() -> None:
+    """test_immutable_1."""
+    p: Parser = token("foo")
+    with pytest.raises(AttributeError):
+        p.expression = "bar"
+    with pytest.raises(AttributeError):
+        choice(p, token("bar")).parser_type = "seq"
+
+
+def test_children_1() -> None:
+    """test_children_1."""
+    p: Parser = choice(token("foo"), seq(token("b"), token("ar")))
+    for _ in range(3):
+        result = p.exec("baz")
+        assert len(result.children) == 2
+        assert len(result.children[1].children) == 2
+
+
+def test_exec_many_1() -> None:
+    """test_exec_many_1."""
+    num = regex(r"\d+")
+    p: Parser = seq(token("["), sep_by(choice(num, token("x")), token(",")), token("]"))  # noqa E501
+    inputs = ["[" + ",".join(str(j) if j % 3 else "x" for j in range(i)) + "]"
+              for i in range(1, 300)]
+    expected = [p.exec(s).tokens for s in inputs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = p.exec_many(inputs, executor=pool)
+        assert [r.tokens for r in results] == expected
+        results = p.exec_many(inputs, executor=pool,
+                              context=lambda: ParseContext(memo=True))
+        assert [r.tokens for r in results] == expected
+    assert [r.tokens for r in p.exec_many(inputs)] == expected